@@ -1,37 +1,374 @@
+import bisect
 import json
+import mmap
 import os
-from typing import List, Dict, Any, Optional
+import shutil
+import sqlite3
+import threading
+import orjson
+from typing import Callable, ContextManager, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
 
-class DataManager:
+# orjson options shared by every stored file, journal line and database row
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+NDJSON_LINE_OPTIONS = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+
+# Files at least this large are memory-mapped for reading instead of copied into memory
+MMAP_READ_THRESHOLD = 256 * 1024
+
+def synchronized(method):
+    """Run a data manager method while holding the instance's lock"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class BaseDataManager(ABC):
+    """
+    Storage interface shared by the JSON file and SQLite backends
+    
+    Subclasses store the records; ID generation, statistics, export and
+    clearing are built on the public methods below, so both backends
+    behave the same. Records with duplicate IDs are all kept, and lookups
+    and updates by ID use the first one stored. Instances are thread-safe.
+    """
+    
+    def __init__(self, data_directory: str = "data", durable_writes: bool = True):
+        """
+        Initialize state shared by every backend
+        
+        Args:
+            data_directory: Directory to store data files
+            durable_writes: Sync data to disk before a write is reported done
+        """
+        self.data_dir = Path(data_directory)
+        self.data_dir.mkdir(exist_ok=True)
+        self.durable_writes = durable_writes
+        
+        # Guards all state below; re-entrant so public methods can call each other
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        
+        # Last issued ID sequence number per record type, seeded on first use
+        self._id_sequences: Dict[str, int] = {}
+    
+    def close(self):
+        """Release resources held by the backend"""
+    
+    @abstractmethod
+    def flush(self):
+        """Make sure every change is stored in its canonical form"""
+    
+    @abstractmethod
+    def transaction(self) -> ContextManager["BaseDataManager"]:
+        """Group several mutations, storing all of them or none if the block raises"""
+    
+    # Application Management Methods
+    @abstractmethod
+    def load_applications(self) -> List[Dict[str, Any]]:
+        """Load all applications"""
+    
+    @abstractmethod
+    def save_applications(self, applications: List[Dict[str, Any]]):
+        """Replace all applications"""
+    
+    @abstractmethod
+    def get_application_by_id(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """Get specific application by ID"""
+    
+    @abstractmethod
+    def update_application(self, application_id: str, updates: Dict[str, Any]) -> bool:
+        """Update specific application, returning False if it doesn't exist"""
+    
+    def _next_id_sequence(self, record_type: str,
+                          load_records: Callable[[], List[Dict[str, Any]]]) -> int:
+        """
+        Get the next sequence number for generated IDs
+        
+        The sequence starts after the number of stored records and is then
+        incremented in memory, so IDs handed out before their records are
+        saved are never reused.
+        
+        Args:
+            record_type: Name of the ID sequence
+            load_records: Loader used to seed the sequence on first use
+            
+        Returns:
+            Next sequence number
+        """
+        with self._lock:
+            sequence = self._id_sequences.get(record_type)
+            if sequence is None:
+                sequence = len(load_records())
+            sequence += 1
+            self._id_sequences[record_type] = sequence
+            return sequence
+    
+    @synchronized
+    def generate_application_id(self) -> str:
+        """Generate unique application ID"""
+        # Generate ID with format: APP_YYYYMMDD_HHMMSS_XXXX
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        counter = self._next_id_sequence("application", self.load_applications)
+        
+        return f"APP_{timestamp}_{counter:04d}"
+    
+    # Certificate Management Methods
+    @abstractmethod
+    def load_certificates(self) -> List[Dict[str, Any]]:
+        """Load all certificates"""
+    
+    @abstractmethod
+    def save_certificates(self, certificates: List[Dict[str, Any]]):
+        """Replace all certificates"""
+    
+    @abstractmethod
+    def get_certificate_by_id(self, certificate_id: str) -> Optional[Dict[str, Any]]:
+        """Get specific certificate by ID"""
+    
+    @abstractmethod
+    def get_certificate_by_application_id(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """Get certificate by application ID"""
+    
+    @abstractmethod
+    def update_certificate(self, certificate_id: str, updates: Dict[str, Any]) -> bool:
+        """Update specific certificate, returning False if it doesn't exist"""
+    
+    @synchronized
+    def generate_certificate_id(self) -> str:
+        """Generate unique certificate ID"""
+        # Generate ID with format: CERT_YYYYMMDD_HHMMSS_XXXX
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        counter = self._next_id_sequence("certificate", self.load_certificates)
+        
+        return f"CERT_{timestamp}_{counter:04d}"
+    
+    # Payment Management Methods
+    @abstractmethod
+    def load_payments(self) -> List[Dict[str, Any]]:
+        """Load all payment records"""
+    
+    @abstractmethod
+    def save_payments(self, payments: List[Dict[str, Any]]):
+        """Replace all payment records"""
+    
+    @abstractmethod
+    def get_payments_by_application_id(self, application_id: str) -> List[Dict[str, Any]]:
+        """Get all payment records for specific application"""
+    
+    @abstractmethod
+    def add_payment_record(self, payment_record: Dict[str, Any]):
+        """Add new payment record"""
+    
+    # Audit Log Management Methods
+    @abstractmethod
+    def load_audit_logs(self) -> List[Dict[str, Any]]:
+        """Load all audit logs"""
+    
+    @abstractmethod
+    def save_audit_logs(self, audit_logs: List[Dict[str, Any]]):
+        """Replace all audit logs"""
+    
+    @abstractmethod
+    def add_audit_log(self, application_id: str, action: str, details: Optional[Dict[str, Any]] = None):
+        """Add new audit log entry"""
+    
+    @abstractmethod
+    def get_audit_trail(self, application_id: str) -> Dict[str, Any]:
+        """Get audit trail for specific application"""
+    
+    @staticmethod
+    def _audit_trail_result(application_id: str, app_logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Summarize an application's audit entries, already in timestamp order"""
+        return {
+            "application_id": application_id,
+            "total_entries": len(app_logs),
+            "audit_trail": app_logs,
+            "first_entry": app_logs[0]["timestamp"] if app_logs else None,
+            "last_entry": app_logs[-1]["timestamp"] if app_logs else None
+        }
+    
+    # Utility Methods
+    @abstractmethod
+    def backup_data(self, backup_suffix: Optional[str] = None) -> Dict[str, str]:
+        """Create backup of all data, returning original to backup paths"""
+    
+    @synchronized
+    def export_pretty(self, export_directory: Optional[str] = None) -> Dict[str, str]:
+        """
+        Export all data as indented JSON for human reading
+        
+        Args:
+            export_directory: Directory for exported files (defaults to
+                an "export" folder inside the data directory)
+            
+        Returns:
+            Dictionary mapping data type to exported file path
+        """
+        export_dir = Path(export_directory) if export_directory else self.data_dir / "export"
+        export_dir.mkdir(parents=True, exist_ok=True)
+        
+        data_to_export = {
+            "applications": self.load_applications(),
+            "certificates": self.load_certificates(),
+            "payments": self.load_payments(),
+            "audit_logs": self.load_audit_logs()
+        }
+        
+        export_paths = {}
+        for data_type, data in data_to_export.items():
+            export_path = export_dir / f"{data_type}.json"
+            with open(export_path, 'wb') as f:
+                f.write(orjson.dumps(data, default=str,
+                                     option=orjson.OPT_INDENT_2 | ORJSON_OPTIONS))
+            export_paths[data_type] = str(export_path)
+        
+        return export_paths
+    
+    @synchronized
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get statistics about stored data"""
+        applications = self.load_applications()
+        certificates = self.load_certificates()
+        payments = self.load_payments()
+        audit_logs = self.load_audit_logs()
+        
+        # Application statistics
+        app_statuses = dict(Counter([app.get("status", "Unknown") for app in applications]))
+        
+        # Certificate statistics
+        cert_statuses = dict(Counter([cert.get("status", "Unknown") for cert in certificates]))
+        
+        # Payment statistics
+        payment_statuses = dict(Counter([payment.get("status", "Unknown") for payment in payments]))
+        
+        return {
+            "applications": {
+                "total": len(applications),
+                "by_status": app_statuses
+            },
+            "certificates": {
+                "total": len(certificates),
+                "by_status": cert_statuses
+            },
+            "payments": {
+                "total": len(payments),
+                "by_status": payment_statuses
+            },
+            "audit_logs": {
+                "total": len(audit_logs)
+            },
+            "data_directory": str(self.data_dir),
+            "last_updated": datetime.now().isoformat()
+        }
+    
+    @synchronized
+    def clear_all_data(self, confirm: bool = False):
+        """
+        Clear all data (use with caution!)
+        
+        Args:
+            confirm: Must be True to actually clear data
+        """
+        if not confirm:
+            raise ValueError("Must set confirm=True to clear all data")
+        
+        # Create backup first
+        backup_paths = self.backup_data("before_clear")
+        
+        # Clear all files
+        with self.transaction():
+            self.save_applications([])
+            self.save_certificates([])
+            self.save_payments([])
+            self.save_audit_logs([])
+        
+        return {
+            "message": "All data cleared successfully",
+            "backup_created": backup_paths
+        }
+
+class DataManager(BaseDataManager):
     """
     Data Manager class for handling JSON file operations
     Manages applications, certificates, payments, and audit logs
+    Instances are thread-safe; use get_data_manager() to share one per directory.
+    Records are passed in and out as deep copies, so changes, including
+    to nested fields, only take effect through the save, update and add
+    methods.
     """
     
-    def __init__(self, data_directory: str = "data"):
+    def __init__(self, data_directory: str = "data", durable_writes: bool = True):
         """
         Initialize DataManager with data directory
         
         Args:
             data_directory: Directory to store JSON files
+            durable_writes: fsync each data file before it replaces the old one
         """
-        self.data_dir = Path(data_directory)
-        self.data_dir.mkdir(exist_ok=True)
+        super().__init__(data_directory, durable_writes)
         
         # Define file paths
         self.applications_file = self.data_dir / "applications.json"
         self.certificates_file = self.data_dir / "certificates.json"
-        self.payments_file = self.data_dir / "payments.json"
-        self.audit_logs_file = self.data_dir / "audit_logs.json"
+        # Payments and audit logs are append-only, stored as one JSON record per line
+        self.payments_file = self.data_dir / "payments.ndjson"
+        self.audit_logs_file = self.data_dir / "audit_logs.ndjson"
+        
+        # Append-only journals of updates not yet compacted into the JSON files
+        self.applications_journal = self.data_dir / "applications.log"
+        self.certificates_journal = self.data_dir / "certificates.log"
+        self._journals = {
+            self.applications_file: self.applications_journal,
+            self.certificates_file: self.certificates_journal
+        }
         
-        # Initialize files if they don't exist
-        self._initialize_files()
+        # Journal (mtime_ns, size) as of this instance's last replay or append,
+        # None when it was empty; a different state means another instance wrote it
+        self._journal_states: Dict[Path, Optional[Tuple[int, int]]] = {}
+        
+        # Parsed file contents keyed by path, with the (mtime_ns, size) they were read at
+        self._file_cache: Dict[Path, Tuple[int, int, List[Dict[str, Any]]]] = {}
+        
+        # Writes deferred by an open transaction(), committed when it exits
+        self._pending_writes: Dict[Path, List[Dict[str, Any]]] = {}
+        self._pending_journal_lines: Dict[Path, List[bytes]] = {}
+        self._journals_to_clear: set = set()
+        
+        # In-memory records and ID indexes, loaded lazily on first access
+        self._applications: Optional[List[Dict[str, Any]]] = None
+        self._apps_by_id: Dict[str, Dict[str, Any]] = {}
+        self._certificates: Optional[List[Dict[str, Any]]] = None
+        self._certs_by_id: Dict[str, Dict[str, Any]] = {}
+        self._certs_by_app_id: Dict[str, Dict[str, Any]] = {}
+        self._payments: Optional[List[Dict[str, Any]]] = None
+        self._payments_by_app_id: Dict[str, List[Dict[str, Any]]] = {}
+        self._audit_logs: Optional[List[Dict[str, Any]]] = None
+        self._audit_by_app_id: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # Initialize files if they don't exist, listing the directory once
+        existing_files = {entry.name for entry in os.scandir(self.data_dir)}
+        self._migrate_legacy_files(existing_files)
+        self._initialize_files(existing_files)
     
-    def _initialize_files(self):
-        """Initialize JSON files with empty arrays if they don't exist"""
+    def _migrate_legacy_files(self, existing_files: set):
+        """Convert JSON array files from older versions to NDJSON"""
+        for ndjson_file in (self.payments_file, self.audit_logs_file):
+            legacy_file = ndjson_file.with_suffix(".json")
+            if legacy_file.name in existing_files and ndjson_file.name not in existing_files:
+                self._write_json_file(ndjson_file, self._read_json_file(legacy_file))
+                self._file_cache.pop(legacy_file, None)
+                existing_files.add(ndjson_file.name)
+    
+    def _initialize_files(self, existing_files: set):
+        """Initialize data files as empty if they don't exist"""
         files_to_init = [
             self.applications_file,
             self.certificates_file,
@@ -40,65 +377,478 @@ class DataManager:
         ]
         
         for file_path in files_to_init:
-            if not file_path.exists():
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump([], f, indent=2, ensure_ascii=False)
+            if file_path.name not in existing_files:
+                with open(file_path, 'wb') as f:
+                    f.write(self._encode_records(file_path, []))
+    
+    @staticmethod
+    def _encode_records(file_path: Path, data: List[Dict[str, Any]]) -> bytes:
+        """Serialize records as a JSON array, or one per line for .ndjson files"""
+        if file_path.suffix == ".ndjson":
+            dumps = orjson.dumps
+            return b"".join([dumps(record, default=str, option=NDJSON_LINE_OPTIONS) for record in data])
+        return orjson.dumps(data, default=str, option=ORJSON_OPTIONS)
+    
+    @staticmethod
+    def _decode_records(file_path: Path, content) -> List[Dict[str, Any]]:
+        """Parse file content (bytes or a read-only mmap) written by _encode_records"""
+        is_mapped = isinstance(content, mmap.mmap)
+        if file_path.suffix == ".ndjson":
+            records = []
+            lines = iter(content.readline, b"") if is_mapped else content.splitlines()
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # Torn trailing line from an interrupted append
+                    continue
+            return records
+        if is_mapped:
+            # Only files above MMAP_READ_THRESHOLD are mapped, so never empty
+            with memoryview(content) as view:
+                return orjson.loads(view)
+        return orjson.loads(content) if content.strip() else []
+    
+    def _is_cache_current(self, file_path: Path) -> bool:
+        """Check whether reading a file would return its cached records"""
+        if file_path in self._pending_writes:
+            return True
+        cached = self._file_cache.get(file_path)
+        if cached is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return False
+        return (cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size and
+                self._is_journal_applied(file_path))
+    
+    def _scan_records(self, file_path: Path, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Find records in an NDJSON file whose field equals value
+        
+        Only lines containing the encoded field/value pair are parsed, so
+        most of the file is skipped with a bytes search.
+        
+        Args:
+            file_path: Path to NDJSON file
+            field: Record field to match
+            value: Value the field must have
+            
+        Returns:
+            Matching records in file order
+        """
+        needle = orjson.dumps(field) + b":" + orjson.dumps(value)
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < MMAP_READ_THRESHOLD:
+                    lines = [line for line in f if needle in line]
+                else:
+                    # Jump between occurrences of the needle instead of reading every line
+                    lines = []
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        position = mm.find(needle)
+                        while position != -1:
+                            line_start = mm.rfind(b"\n", 0, position) + 1
+                            line_end = mm.find(b"\n", position)
+                            if line_end == -1:
+                                line_end = len(mm)
+                            lines.append(mm[line_start:line_end])
+                            position = mm.find(needle, line_end)
+        except FileNotFoundError:
+            return []
+        
+        records = []
+        for line in lines:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if record.get(field) == value:
+                records.append(record)
+        return records
     
     def _read_json_file(self, file_path: Path) -> List[Dict[str, Any]]:
         """
         Read and parse JSON file
         
+        Parsed contents are cached and reused for as long as the file's
+        modification time and size are unchanged and no other instance has
+        journaled updates to it.
+        
         Args:
             file_path: Path to JSON file
             
         Returns:
             List of dictionaries from JSON file
         """
+        pending = self._pending_writes.get(file_path)
+        if pending is not None:
+            return pending
+        
         try:
-            if not file_path.exists():
-                return []
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if not content:
-                    return []
-                return json.loads(content)
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            self._file_cache.pop(file_path, None)
+            return []
+        
+        cached = self._file_cache.get(file_path)
+        if (cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size and
+                self._is_journal_applied(file_path)):
+            return cached[2]
+        
+        try:
+            with open(file_path, 'rb') as f:
+                if stat.st_size >= MMAP_READ_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        data = self._decode_records(file_path, mm)
+                else:
+                    data = self._decode_records(file_path, f.read())
         except (json.JSONDecodeError, FileNotFoundError) as e:
             print(f"Error reading {file_path}: {e}")
             return []
+        
+        self._file_cache[file_path] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
     
     def _write_json_file(self, file_path: Path, data: List[Dict[str, Any]]):
         """
         Write data to JSON file
         
+        Files are written compactly since they are machine-read; use
+        export_pretty() for a human-readable copy. Data goes to a temporary
+        file that atomically replaces the original, so readers never see a
+        torn file. Inside a transaction() the write is deferred until the
+        transaction exits.
+        
         Args:
             file_path: Path to JSON file
             data: List of dictionaries to write
         """
+        if self._transaction_depth:
+            self._pending_writes[file_path] = data
+            # The rewrite replaces the whole file, so lines queued by
+            # _append_record must not be appended after it
+            self._pending_journal_lines.pop(file_path, None)
+            return
+        
+        tmp_path = file_path.with_name(f"{file_path.name}.tmp.{os.getpid()}.{uuid.uuid4().hex[:8]}")
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            with open(tmp_path, 'wb') as f:
+                f.write(self._encode_records(file_path, data))
+                if self.durable_writes:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
         except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self._file_cache.pop(file_path, None)
             print(f"Error writing to {file_path}: {e}")
             raise
+        
+        # Keep the data just written as the cached copy
+        stat = os.stat(file_path)
+        self._file_cache[file_path] = (stat.st_mtime_ns, stat.st_size, data)
+    
+    def _append_record(self, file_path: Path, record: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Append a single record to an NDJSON file
+        
+        The file is not read or rewritten; an already-loaded copy of its
+        records is extended in place instead of being reparsed. Inside a
+        transaction() the line is appended when the transaction exits.
+        
+        Args:
+            file_path: Path to NDJSON file
+            record: Record to append
+            
+        Returns:
+            The in-memory record list that now includes the record, or None
+            if the file was not loaded
+        """
+        if self._transaction_depth:
+            records = self._pending_writes.get(file_path)
+            if records is not None:
+                # The whole file is rewritten on commit
+                records.append(record)
+                return records
+            # Keep the record visible to reads until the line is appended
+            records = self._read_json_file(file_path)
+            records.append(record)
+            self._pending_journal_lines.setdefault(file_path, []).append(
+                self._encode_records(file_path, [record]))
+            return records
+        
+        cached = self._file_cache.get(file_path)
+        with open(file_path, 'a+b') as f:
+            stat = os.fstat(f.fileno())
+            cache_fresh = (cached is not None and
+                           cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size)
+            self._end_torn_line(f)
+            f.write(self._encode_records(file_path, [record]))
+            f.flush()
+            stat = os.fstat(f.fileno())
+        
+        if not cache_fresh:
+            return None
+        cached[2].append(record)
+        self._file_cache[file_path] = (stat.st_mtime_ns, stat.st_size, cached[2])
+        return cached[2]
+    
+    @staticmethod
+    def _copy_records(records: Any) -> Any:
+        """
+        Deep-copy a record or list of records so callers never share the
+        cached dicts or anything nested in them. The copy goes through the
+        same encoding as the files, so it matches what a reload returns.
+        """
+        return orjson.loads(orjson.dumps(records, default=str, option=ORJSON_OPTIONS))
+    
+    # Journal Methods
+    def _append_journal(self, journal_path: Path, record_id: str, patch: Dict[str, Any]):
+        """
+        Append a single update to a journal file
+        
+        Args:
+            journal_path: Path to journal file
+            record_id: ID of updated record
+            patch: Fields that were updated
+        """
+        line = orjson.dumps({"op": "upd", "id": record_id, "patch": patch},
+                            default=str, option=NDJSON_LINE_OPTIONS)
+        if self._transaction_depth:
+            self._pending_journal_lines.setdefault(journal_path, []).append(line)
+            return
+        
+        self._write_journal_lines(journal_path, line)
+    
+    def _write_journal_lines(self, journal_path: Path, lines: bytes):
+        """Append encoded lines to a journal file"""
+        with open(journal_path, 'a+b') as f:
+            before = self._journal_state(os.fstat(f.fileno()))
+            self._end_torn_line(f)
+            f.write(lines)
+            f.flush()
+            after = self._journal_state(os.fstat(f.fileno()))
+        
+        # Only our own lines were added, so everything in the journal is still applied
+        if self._journal_states.get(journal_path) == before:
+            self._journal_states[journal_path] = after
+    
+    @staticmethod
+    def _end_torn_line(f):
+        """
+        Terminate a torn final line before appending to a line-based file
+        
+        Readers skip a line cut short by an interrupted append; without
+        the newline the next record would be joined to it and lost too.
+        
+        Args:
+            f: File opened in 'a+b' mode
+        """
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    
+    @staticmethod
+    def _journal_state(stat: os.stat_result) -> Optional[Tuple[int, int]]:
+        """Identify a journal's contents by modification time and size"""
+        return (stat.st_mtime_ns, stat.st_size) if stat.st_size else None
+    
+    def _is_journal_applied(self, file_path: Path) -> bool:
+        """Check whether this instance has applied every update journaled for a file"""
+        journal_path = self._journals.get(file_path)
+        if journal_path is None:
+            return True
+        try:
+            current = self._journal_state(os.stat(journal_path))
+        except FileNotFoundError:
+            current = None
+        return self._journal_states.get(journal_path) == current
+    
+    def _clear_journal(self, journal_path: Path):
+        """Discard journaled updates that are now in the JSON file"""
+        self._pending_journal_lines.pop(journal_path, None)
+        if self._transaction_depth:
+            # Keep the journal until the compacted file is actually written
+            self._journals_to_clear.add(journal_path)
+        else:
+            self._discard_applied_journal(journal_path)
+    
+    def _discard_applied_journal(self, journal_path: Path):
+        """
+        Remove the updates this instance has applied from a journal
+        
+        Lines other instances appended since this instance last replayed
+        the journal are kept, so their updates still apply on top of the
+        compacted file.
+        
+        Args:
+            journal_path: Path to journal file
+        """
+        applied = self._journal_states.get(journal_path)
+        self._journal_states[journal_path] = None
+        try:
+            with open(journal_path, 'rb') as f:
+                current = self._journal_state(os.fstat(f.fileno()))
+                if current is None or current == applied:
+                    unapplied = b""
+                else:
+                    # Appends only ever grow the journal past what was applied
+                    f.seek(applied[1] if applied is not None and applied[1] < current[1] else 0)
+                    unapplied = f.read()
+        except FileNotFoundError:
+            return
+        
+        if not unapplied:
+            journal_path.unlink(missing_ok=True)
+            return
+        tmp_path = journal_path.with_name(f"{journal_path.name}.tmp.{os.getpid()}.{uuid.uuid4().hex[:8]}")
+        try:
+            tmp_path.write_bytes(unapplied)
+            os.replace(tmp_path, journal_path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    def _has_journal(self, journal_path: Path) -> bool:
+        """Check whether a journal holds updates not yet compacted"""
+        return journal_path in self._pending_journal_lines or journal_path.exists()
+    
+    def _replay_journal(self, journal_path: Path, records_by_id: Dict[str, Dict[str, Any]]):
+        """
+        Apply journaled updates to records loaded from a JSON file
+        
+        Args:
+            journal_path: Path to journal file
+            records_by_id: Records to update, keyed by ID
+        """
+        try:
+            with open(journal_path, 'rb') as f:
+                self._journal_states[journal_path] = self._journal_state(os.fstat(f.fileno()))
+                for line in f:
+                    try:
+                        entry = orjson.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from an interrupted write
+                        continue
+                    record = records_by_id.get(entry["id"])
+                    if record is not None:
+                        record.update(entry["patch"])
+        except FileNotFoundError:
+            self._journal_states[journal_path] = None
+    
+    @synchronized
+    def flush(self):
+        """Compact journaled updates back into the JSON files"""
+        if self._has_journal(self.applications_journal):
+            self.save_applications(self._ensure_applications())
+        if self._has_journal(self.certificates_journal):
+            self.save_certificates(self._ensure_certificates())
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several mutations into a single write per file
+        
+        Inside the block, saves and journal appends only update memory;
+        each changed file is written once when the outermost block exits.
+        Nested transactions join the outer one. If the block raises, nothing
+        is written and cached records are reloaded from disk. The instance
+        lock is held for the whole block, so other threads never see
+        partial changes.
+        
+        Yields:
+            This DataManager
+        """
+        with self._lock:
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._discard_pending_writes()
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._commit_pending_writes()
+    
+    def _discard_pending_writes(self):
+        """Roll back everything deferred by transaction()"""
+        self._pending_writes = {}
+        self._pending_journal_lines = {}
+        self._journals_to_clear = set()
+        
+        # Records may have been changed in place, so reload them all from disk
+        self._file_cache.clear()
+        self._journal_states.clear()
+        self._applications = None
+        self._apps_by_id = {}
+        self._certificates = None
+        self._certs_by_id = {}
+        self._certs_by_app_id = {}
+        self._payments = None
+        self._payments_by_app_id = {}
+        self._audit_logs = None
+        self._audit_by_app_id = {}
+    
+    def _commit_pending_writes(self):
+        """Write out everything deferred by transaction()"""
+        pending_writes, self._pending_writes = self._pending_writes, {}
+        journals_to_clear, self._journals_to_clear = self._journals_to_clear, set()
+        pending_lines, self._pending_journal_lines = self._pending_journal_lines, {}
+        
+        for file_path, data in pending_writes.items():
+            self._write_json_file(file_path, data)
+        for journal_path in journals_to_clear:
+            self._discard_applied_journal(journal_path)
+        for journal_path, lines in pending_lines.items():
+            self._write_journal_lines(journal_path, b"".join(lines))
     
     # Application Management Methods
+    def _index_applications(self, applications: List[Dict[str, Any]]):
+        """Rebuild the application ID index"""
+        apps_by_id = {}
+        for app in applications:
+            apps_by_id.setdefault(app.get("application_id"), app)
+        self._applications = applications
+        self._apps_by_id = apps_by_id
+    
+    def _ensure_applications(self) -> List[Dict[str, Any]]:
+        """Load applications and their ID index on first access"""
+        applications = self._read_json_file(self.applications_file)
+        if applications is not self._applications:
+            # First access, or the file changed on disk since it was cached
+            self._index_applications(applications)
+            self._replay_journal(self.applications_journal, self._apps_by_id)
+        return applications
+    
+    @synchronized
     def load_applications(self) -> List[Dict[str, Any]]:
         """Load all applications from JSON file"""
-        return self._read_json_file(self.applications_file)
+        return self._copy_records(self._ensure_applications())
     
+    @synchronized
     def save_applications(self, applications: List[Dict[str, Any]]):
         """Save applications to JSON file"""
+        applications = self._copy_records(applications)
         self._write_json_file(self.applications_file, applications)
+        self._clear_journal(self.applications_journal)
+        self._index_applications(applications)
     
+    @synchronized
     def get_application_by_id(self, application_id: str) -> Optional[Dict[str, Any]]:
         """Get specific application by ID"""
-        applications = self.load_applications()
-        for app in applications:
-            if app.get("application_id") == application_id:
-                return app
-        return None
+        self._ensure_applications()
+        app = self._apps_by_id.get(application_id)
+        return self._copy_records(app) if app is not None else None
     
+    @synchronized
     def update_application(self, application_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update specific application
@@ -110,52 +860,65 @@ class DataManager:
         Returns:
             True if updated successfully, False if application not found
         """
-        applications = self.load_applications()
-        
-        for i, app in enumerate(applications):
-            if app.get("application_id") == application_id:
-                applications[i].update(updates)
-                applications[i]["last_updated"] = datetime.now().isoformat()
-                self.save_applications(applications)
-                return True
+        self._ensure_applications()
+        app = self._apps_by_id.get(application_id)
+        if app is None:
+            return False
         
-        return False
-    
-    def generate_application_id(self) -> str:
-        """Generate unique application ID"""
-        applications = self.load_applications()
-        
-        # Generate ID with format: APP_YYYYMMDD_HHMMSS_XXXX
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        counter = len(applications) + 1
-        
-        return f"APP_{timestamp}_{counter:04d}"
+        patch = self._copy_records(dict(updates, last_updated=datetime.now().isoformat()))
+        app.update(patch)
+        self._append_journal(self.applications_journal, application_id, patch)
+        return True
     
     # Certificate Management Methods
+    def _index_certificates(self, certificates: List[Dict[str, Any]]):
+        """Rebuild the certificate ID and application ID indexes"""
+        certs_by_id = {}
+        certs_by_app_id = {}
+        for cert in certificates:
+            certs_by_id.setdefault(cert.get("certificate_id"), cert)
+            certs_by_app_id.setdefault(cert.get("application_id"), cert)
+        self._certificates = certificates
+        self._certs_by_id = certs_by_id
+        self._certs_by_app_id = certs_by_app_id
+    
+    def _ensure_certificates(self) -> List[Dict[str, Any]]:
+        """Load certificates and their indexes on first access"""
+        certificates = self._read_json_file(self.certificates_file)
+        if certificates is not self._certificates:
+            # First access, or the file changed on disk since it was cached
+            self._index_certificates(certificates)
+            self._replay_journal(self.certificates_journal, self._certs_by_id)
+        return certificates
+    
+    @synchronized
     def load_certificates(self) -> List[Dict[str, Any]]:
         """Load all certificates from JSON file"""
-        return self._read_json_file(self.certificates_file)
+        return self._copy_records(self._ensure_certificates())
     
+    @synchronized
     def save_certificates(self, certificates: List[Dict[str, Any]]):
         """Save certificates to JSON file"""
+        certificates = self._copy_records(certificates)
         self._write_json_file(self.certificates_file, certificates)
+        self._clear_journal(self.certificates_journal)
+        self._index_certificates(certificates)
     
+    @synchronized
     def get_certificate_by_id(self, certificate_id: str) -> Optional[Dict[str, Any]]:
         """Get specific certificate by ID"""
-        certificates = self.load_certificates()
-        for cert in certificates:
-            if cert.get("certificate_id") == certificate_id:
-                return cert
-        return None
+        self._ensure_certificates()
+        cert = self._certs_by_id.get(certificate_id)
+        return self._copy_records(cert) if cert is not None else None
     
+    @synchronized
     def get_certificate_by_application_id(self, application_id: str) -> Optional[Dict[str, Any]]:
         """Get certificate by application ID"""
-        certificates = self.load_certificates()
-        for cert in certificates:
-            if cert.get("application_id") == application_id:
-                return cert
-        return None
+        self._ensure_certificates()
+        cert = self._certs_by_app_id.get(application_id)
+        return self._copy_records(cert) if cert is not None else None
     
+    @synchronized
     def update_certificate(self, certificate_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update specific certificate
@@ -167,79 +930,129 @@ class DataManager:
         Returns:
             True if updated successfully, False if certificate not found
         """
-        certificates = self.load_certificates()
-        
-        for i, cert in enumerate(certificates):
-            if cert.get("certificate_id") == certificate_id:
-                certificates[i].update(updates)
-                certificates[i]["last_updated"] = datetime.now().isoformat()
-                self.save_certificates(certificates)
-                return True
-        
-        return False
-    
-    def generate_certificate_id(self) -> str:
-        """Generate unique certificate ID"""
-        certificates = self.load_certificates()
+        self._ensure_certificates()
+        cert = self._certs_by_id.get(certificate_id)
+        if cert is None:
+            return False
         
-        # Generate ID with format: CERT_YYYYMMDD_HHMMSS_XXXX
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        counter = len(certificates) + 1
-        
-        return f"CERT_{timestamp}_{counter:04d}"
+        patch = self._copy_records(dict(updates, last_updated=datetime.now().isoformat()))
+        cert.update(patch)
+        self._append_journal(self.certificates_journal, certificate_id, patch)
+        return True
     
     # Payment Management Methods
+    def _index_payments(self, payments: List[Dict[str, Any]]):
+        """Rebuild the payments-by-application index"""
+        payments_by_app_id = {}
+        for payment in payments:
+            payments_by_app_id.setdefault(payment.get("application_id"), []).append(payment)
+        self._payments = payments
+        self._payments_by_app_id = payments_by_app_id
+    
+    def _ensure_payments(self) -> List[Dict[str, Any]]:
+        """Load payments and their index on first access"""
+        payments = self._read_json_file(self.payments_file)
+        if payments is not self._payments:
+            self._index_payments(payments)
+        return payments
+    
+    @synchronized
     def load_payments(self) -> List[Dict[str, Any]]:
-        """Load all payment records from JSON file"""
-        return self._read_json_file(self.payments_file)
+        """Load all payment records from NDJSON file"""
+        return self._copy_records(self._ensure_payments())
     
+    @synchronized
     def save_payments(self, payments: List[Dict[str, Any]]):
-        """Save payment records to JSON file"""
+        """Rewrite the NDJSON payments file with the given records"""
+        payments = self._copy_records(payments)
         self._write_json_file(self.payments_file, payments)
+        self._index_payments(payments)
     
+    @synchronized
     def get_payments_by_application_id(self, application_id: str) -> List[Dict[str, Any]]:
         """Get all payment records for specific application"""
-        payments = self.load_payments()
-        return [payment for payment in payments if payment.get("application_id") == application_id]
+        self._ensure_payments()
+        return self._copy_records(self._payments_by_app_id.get(application_id, []))
     
+    @synchronized
     def add_payment_record(self, payment_record: Dict[str, Any]):
-        """Add new payment record"""
-        payments = self.load_payments()
+        """Add new payment record, appended without rewriting the file"""
         payment_record["created_at"] = datetime.now().isoformat()
-        payments.append(payment_record)
-        self.save_payments(payments)
+        payment_record = self._copy_records(payment_record)
+        payments = self._append_record(self.payments_file, payment_record)
+        
+        # Keep the index in step when the indexed list was extended in place
+        if payments is not None and payments is self._payments:
+            application_id = payment_record.get("application_id")
+            self._payments_by_app_id.setdefault(application_id, []).append(payment_record)
     
     # Audit Log Management Methods
+    def _index_audit_logs(self, audit_logs: List[Dict[str, Any]]):
+        """Rebuild the per-application audit trails, each sorted by timestamp"""
+        audit_by_app_id = {}
+        for log in audit_logs:
+            audit_by_app_id.setdefault(log.get("application_id"), []).append(log)
+        for app_logs in audit_by_app_id.values():
+            app_logs.sort(key=lambda x: x.get("timestamp", ""))
+        self._audit_logs = audit_logs
+        self._audit_by_app_id = audit_by_app_id
+    
+    def _insert_audit_trail_entry(self, log_entry: Dict[str, Any]):
+        """Insert an entry into its application's trail, keeping timestamp order"""
+        app_logs = self._audit_by_app_id.setdefault(log_entry.get("application_id"), [])
+        timestamp = log_entry.get("timestamp", "")
+        if not app_logs or app_logs[-1].get("timestamp", "") <= timestamp:
+            app_logs.append(log_entry)
+            return
+        position = bisect.bisect_right([log.get("timestamp", "") for log in app_logs], timestamp)
+        app_logs.insert(position, log_entry)
+    
+    def _ensure_audit_logs(self) -> List[Dict[str, Any]]:
+        """Load audit logs and their per-application trails on first access"""
+        audit_logs = self._read_json_file(self.audit_logs_file)
+        if audit_logs is not self._audit_logs:
+            self._index_audit_logs(audit_logs)
+        return audit_logs
+    
+    @synchronized
     def load_audit_logs(self) -> List[Dict[str, Any]]:
-        """Load all audit logs from JSON file"""
-        return self._read_json_file(self.audit_logs_file)
+        """Load all audit logs from NDJSON file"""
+        return self._copy_records(self._ensure_audit_logs())
     
+    @synchronized
     def save_audit_logs(self, audit_logs: List[Dict[str, Any]]):
-        """Save audit logs to JSON file"""
+        """Rewrite the NDJSON audit log file with the given entries"""
+        audit_logs = self._copy_records(audit_logs)
         self._write_json_file(self.audit_logs_file, audit_logs)
+        self._index_audit_logs(audit_logs)
     
+    @synchronized
     def add_audit_log(self, application_id: str, action: str, details: Optional[Dict[str, Any]] = None):
         """
         Add new audit log entry
         
+        The entry is appended as a single line, without reading or
+        rewriting the existing log.
+        
         Args:
             application_id: ID of related application
             action: Description of action performed
             details: Optional additional details
         """
-        audit_logs = self.load_audit_logs()
-        
         log_entry = {
             "log_id": str(uuid.uuid4()),
             "application_id": application_id,
             "action": action,
             "timestamp": datetime.now().isoformat(),
-            "details": details or {}
+            "details": self._copy_records(details) if details else {}
         }
+        audit_logs = self._append_record(self.audit_logs_file, log_entry)
         
-        audit_logs.append(log_entry)
-        self.save_audit_logs(audit_logs)
+        # Keep the index in step when the indexed list was extended in place
+        if audit_logs is not None and audit_logs is self._audit_logs:
+            self._insert_audit_trail_entry(log_entry)
     
+    @synchronized
     def get_audit_trail(self, application_id: str) -> Dict[str, Any]:
         """
         Get audit trail for specific application
@@ -250,26 +1063,21 @@ class DataManager:
         Returns:
             Dictionary containing audit trail information
         """
-        audit_logs = self.load_audit_logs()
-        
-        # Filter logs for this application
-        app_logs = [log for log in audit_logs if log.get("application_id") == application_id]
+        if self._is_cache_current(self.audit_logs_file):
+            self._ensure_audit_logs()
+            app_logs = self._copy_records(self._audit_by_app_id.get(application_id, []))
+        else:
+            # Log not in memory: parse only this application's lines
+            app_logs = self._scan_records(self.audit_logs_file, "application_id", application_id)
+            app_logs.sort(key=lambda x: x.get("timestamp", ""))
         
-        # Sort by timestamp
-        app_logs.sort(key=lambda x: x.get("timestamp", ""))
-        
-        return {
-            "application_id": application_id,
-            "total_entries": len(app_logs),
-            "audit_trail": app_logs,
-            "first_entry": app_logs[0]["timestamp"] if app_logs else None,
-            "last_entry": app_logs[-1]["timestamp"] if app_logs else None
-        }
+        return self._audit_trail_result(application_id, app_logs)
     
     # Utility Methods
+    @synchronized
     def backup_data(self, backup_suffix: Optional[str] = None) -> Dict[str, str]:
         """
-        Create backup of all JSON files
+        Create backup of all data files
         
         Args:
             backup_suffix: Optional suffix for backup files
@@ -280,6 +1088,9 @@ class DataManager:
         if backup_suffix is None:
             backup_suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Make sure journaled updates are part of the backup
+        self.flush()
+        
         backup_paths = {}
         files_to_backup = {
             "applications": self.applications_file,
@@ -290,84 +1101,398 @@ class DataManager:
         
         for file_type, file_path in files_to_backup.items():
             if file_path.exists():
-                backup_path = self.data_dir / f"{file_type}_backup_{backup_suffix}.json"
+                backup_path = self.data_dir / f"{file_type}_backup_{backup_suffix}{file_path.suffix}"
                 
-                # Copy file content
-                with open(file_path, 'r', encoding='utf-8') as src:
-                    with open(backup_path, 'w', encoding='utf-8') as dst:
-                        dst.write(src.read())
+                # JSON files are only ever replaced with a new inode, so a
+                # hard link is a stable point-in-time snapshot. NDJSON files
+                # are appended in place and must be copied, as must any file
+                # that can't be linked (e.g. unsupported filesystem)
+                backup_path.unlink(missing_ok=True)
+                if file_path.suffix == ".ndjson":
+                    shutil.copyfile(file_path, backup_path)
+                else:
+                    try:
+                        os.link(file_path, backup_path)
+                    except OSError:
+                        shutil.copyfile(file_path, backup_path)
                 
                 backup_paths[str(file_path)] = str(backup_path)
         
         return backup_paths
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get statistics about stored data"""
-        applications = self.load_applications()
-        certificates = self.load_certificates()
-        payments = self.load_payments()
-        audit_logs = self.load_audit_logs()
+class SQLiteDataManager(BaseDataManager):
+    """
+    DataManager backed by a single SQLite database in WAL mode
+    
+    Provides the same interface as DataManager, but records are stored as
+    rows so lookups use indexes and updates touch one row instead of
+    rewriting a whole file.
+    """
+    
+    # IDs are indexed but not unique, as duplicate records are kept like in
+    # the JSON files; rowid preserves the order records were stored in
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS applications (
+            application_id TEXT,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_applications_application_id
+            ON applications (application_id);
+        CREATE TABLE IF NOT EXISTS certificates (
+            certificate_id TEXT,
+            application_id TEXT,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_certificates_certificate_id
+            ON certificates (certificate_id);
+        CREATE INDEX IF NOT EXISTS idx_certificates_application_id
+            ON certificates (application_id);
+        CREATE TABLE IF NOT EXISTS payments (
+            application_id TEXT,
+            created_at TEXT,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_payments_application_id
+            ON payments (application_id);
+        CREATE TABLE IF NOT EXISTS audit_logs (
+            log_id TEXT,
+            application_id TEXT,
+            timestamp TEXT,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_audit_logs_application_id_timestamp
+            ON audit_logs (application_id, timestamp);
+    """
+    
+    def __init__(self, data_directory: str = "data", durable_writes: bool = True):
+        """
+        Initialize SQLiteDataManager with data directory
         
-        # Application statistics
-        app_statuses = {}
-        for app in applications:
-            status = app.get("status", "Unknown")
-            app_statuses[status] = app_statuses.get(status, 0) + 1
+        Args:
+            data_directory: Directory to store the database file
+            durable_writes: Sync the WAL on every commit (synchronous=FULL);
+                otherwise only at checkpoints (synchronous=NORMAL)
+        """
+        super().__init__(data_directory, durable_writes)
+        self.db_file = self.data_dir / "data.db"
         
-        # Certificate statistics
-        cert_statuses = {}
-        for cert in certificates:
-            status = cert.get("status", "Unknown")
-            cert_statuses[status] = cert_statuses.get(status, 0) + 1
+        # Autocommit mode; transaction() issues BEGIN/COMMIT explicitly
+        self._conn = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if durable_writes else 'NORMAL'}")
+        self._conn.executescript(self.SCHEMA)
+    
+    @synchronized
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
+    
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        """Serialize one record for the data column"""
+        return orjson.dumps(record, default=str, option=ORJSON_OPTIONS)
+    
+    def _select_records(self, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        """Run a query selecting the data column and decode each row"""
+        return [orjson.loads(row[0]) for row in self._conn.execute(query, params)]
+    
+    @synchronized
+    def flush(self):
+        """Nothing to compact; every change is committed to the database"""
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several mutations into a single database transaction
         
-        # Payment statistics
-        payment_statuses = {}
-        for payment in payments:
-            status = payment.get("status", "Unknown")
-            payment_statuses[status] = payment_statuses.get(status, 0) + 1
+        Nested transactions join the outer one. The transaction is rolled
+        back if the block raises. The instance lock is held for the whole
+        block, since all threads share one connection.
         
-        return {
-            "applications": {
-                "total": len(applications),
-                "by_status": app_statuses
-            },
-            "certificates": {
-                "total": len(certificates),
-                "by_status": cert_statuses
-            },
-            "payments": {
-                "total": len(payments),
-                "by_status": payment_statuses
-            },
-            "audit_logs": {
-                "total": len(audit_logs)
-            },
-            "data_directory": str(self.data_dir),
-            "last_updated": datetime.now().isoformat()
-        }
+        Yields:
+            This SQLiteDataManager
+        """
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._conn.execute("COMMIT")
     
-    def clear_all_data(self, confirm: bool = False):
+    # Application Management Methods
+    @synchronized
+    def load_applications(self) -> List[Dict[str, Any]]:
+        """Load all applications from the database"""
+        return self._select_records("SELECT data FROM applications ORDER BY rowid")
+    
+    @synchronized
+    def save_applications(self, applications: List[Dict[str, Any]]):
+        """Replace all applications in the database"""
+        with self.transaction():
+            self._conn.execute("DELETE FROM applications")
+            self._conn.executemany(
+                "INSERT INTO applications (application_id, data) VALUES (?, ?)",
+                [(app.get("application_id"), self._encode(app)) for app in applications]
+            )
+    
+    @synchronized
+    def get_application_by_id(self, application_id: str) -> Optional[Dict[str, Any]]:
         """
-        Clear all data (use with caution!)
+        Get application by ID
         
         Args:
-            confirm: Must be True to actually clear data
+            application_id: ID of application to find
+            
+        Returns:
+            Application dictionary or None if not found
         """
-        if not confirm:
-            raise ValueError("Must set confirm=True to clear all data")
+        rows = self._select_records(
+            "SELECT data FROM applications WHERE application_id = ? ORDER BY rowid LIMIT 1",
+            (application_id,))
+        return rows[0] if rows else None
+    
+    @synchronized
+    def update_application(self, application_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update specific application
         
-        # Create backup first
-        backup_paths = self.backup_data("before_clear")
+        Args:
+            application_id: ID of application to update
+            updates: Dictionary of fields to update
+            
+        Returns:
+            True if updated successfully, False if application not found
+        """
+        with self.transaction():
+            app = self.get_application_by_id(application_id)
+            if app is None:
+                return False
+            
+            app.update(updates, last_updated=datetime.now().isoformat())
+            self._conn.execute(
+                "UPDATE applications SET data = ? WHERE rowid = "
+                "(SELECT rowid FROM applications WHERE application_id = ? ORDER BY rowid LIMIT 1)",
+                (self._encode(app), application_id))
+        return True
+    
+    # Certificate Management Methods
+    @synchronized
+    def load_certificates(self) -> List[Dict[str, Any]]:
+        """Load all certificates from the database"""
+        return self._select_records("SELECT data FROM certificates ORDER BY rowid")
+    
+    @synchronized
+    def save_certificates(self, certificates: List[Dict[str, Any]]):
+        """Replace all certificates in the database"""
+        with self.transaction():
+            self._conn.execute("DELETE FROM certificates")
+            self._conn.executemany(
+                "INSERT INTO certificates (certificate_id, application_id, data) "
+                "VALUES (?, ?, ?)",
+                [(cert.get("certificate_id"), cert.get("application_id"), self._encode(cert))
+                 for cert in certificates]
+            )
+    
+    @synchronized
+    def get_certificate_by_id(self, certificate_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get certificate by ID
         
-        # Clear all files
-        for file_path in [self.applications_file, self.certificates_file, 
-                         self.payments_file, self.audit_logs_file]:
-            self._write_json_file(file_path, [])
+        Args:
+            certificate_id: ID of certificate to find
+            
+        Returns:
+            Certificate dictionary or None if not found
+        """
+        rows = self._select_records(
+            "SELECT data FROM certificates WHERE certificate_id = ? ORDER BY rowid LIMIT 1",
+            (certificate_id,))
+        return rows[0] if rows else None
+    
+    @synchronized
+    def get_certificate_by_application_id(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get certificate by application ID
         
-        return {
-            "message": "All data cleared successfully",
-            "backup_created": backup_paths
+        Args:
+            application_id: ID of application
+            
+        Returns:
+            Certificate dictionary or None if not found
+        """
+        rows = self._select_records(
+            "SELECT data FROM certificates WHERE application_id = ? ORDER BY rowid LIMIT 1",
+            (application_id,))
+        return rows[0] if rows else None
+    
+    @synchronized
+    def update_certificate(self, certificate_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update specific certificate
+        
+        Args:
+            certificate_id: ID of certificate to update
+            updates: Dictionary of fields to update
+            
+        Returns:
+            True if updated successfully, False if certificate not found
+        """
+        with self.transaction():
+            cert = self.get_certificate_by_id(certificate_id)
+            if cert is None:
+                return False
+            
+            cert.update(updates, last_updated=datetime.now().isoformat())
+            self._conn.execute(
+                "UPDATE certificates SET application_id = ?, data = ? WHERE rowid = "
+                "(SELECT rowid FROM certificates WHERE certificate_id = ? ORDER BY rowid LIMIT 1)",
+                (cert.get("application_id"), self._encode(cert), certificate_id))
+        return True
+    
+    # Payment Management Methods
+    @synchronized
+    def load_payments(self) -> List[Dict[str, Any]]:
+        """Load all payment records from the database"""
+        return self._select_records("SELECT data FROM payments ORDER BY rowid")
+    
+    @synchronized
+    def save_payments(self, payments: List[Dict[str, Any]]):
+        """Replace all payment records in the database"""
+        with self.transaction():
+            self._conn.execute("DELETE FROM payments")
+            self._conn.executemany(
+                "INSERT INTO payments (application_id, created_at, data) VALUES (?, ?, ?)",
+                [(payment.get("application_id"), payment.get("created_at"), self._encode(payment))
+                 for payment in payments]
+            )
+    
+    @synchronized
+    def add_payment_record(self, payment_record: Dict[str, Any]):
+        """
+        Add new payment record
+        
+        Args:
+            payment_record: Payment data dictionary
+        """
+        payment_record["created_at"] = datetime.now().isoformat()
+        self._conn.execute(
+            "INSERT INTO payments (application_id, created_at, data) VALUES (?, ?, ?)",
+            (payment_record.get("application_id"), payment_record["created_at"],
+             self._encode(payment_record)))
+    
+    @synchronized
+    def get_payments_by_application_id(self, application_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all payments for specific application
+        
+        Args:
+            application_id: ID of application
+            
+        Returns:
+            List of payment records
+        """
+        return self._select_records(
+            "SELECT data FROM payments WHERE application_id = ? ORDER BY rowid", (application_id,))
+    
+    # Audit Log Management Methods
+    @synchronized
+    def load_audit_logs(self) -> List[Dict[str, Any]]:
+        """Load all audit logs from the database"""
+        return self._select_records("SELECT data FROM audit_logs ORDER BY rowid")
+    
+    @synchronized
+    def save_audit_logs(self, audit_logs: List[Dict[str, Any]]):
+        """Replace all audit logs in the database"""
+        with self.transaction():
+            self._conn.execute("DELETE FROM audit_logs")
+            self._conn.executemany(
+                "INSERT INTO audit_logs (log_id, application_id, timestamp, data) "
+                "VALUES (?, ?, ?, ?)",
+                [(log.get("log_id"), log.get("application_id"), log.get("timestamp"),
+                  self._encode(log)) for log in audit_logs]
+            )
+    
+    @synchronized
+    def add_audit_log(self, application_id: str, action: str, details: Optional[Dict[str, Any]] = None):
+        """
+        Add new audit log entry
+        
+        Args:
+            application_id: ID of related application
+            action: Description of action performed
+            details: Optional additional details
+        """
+        log_entry = {
+            "log_id": str(uuid.uuid4()),
+            "application_id": application_id,
+            "action": action,
+            "timestamp": datetime.now().isoformat(),
+            "details": details or {}
         }
+        self._conn.execute(
+            "INSERT INTO audit_logs (log_id, application_id, timestamp, data) VALUES (?, ?, ?, ?)",
+            (log_entry["log_id"], application_id, log_entry["timestamp"], self._encode(log_entry)))
+    
+    @synchronized
+    def get_audit_trail(self, application_id: str) -> Dict[str, Any]:
+        """
+        Get audit trail for specific application
+        
+        Args:
+            application_id: ID of application
+            
+        Returns:
+            Dictionary containing audit trail information
+        """
+        app_logs = self._select_records(
+            "SELECT data FROM audit_logs WHERE application_id = ? ORDER BY timestamp, rowid",
+            (application_id,))
+        
+        return self._audit_trail_result(application_id, app_logs)
+    
+    # Utility Methods
+    @synchronized
+    def backup_data(self, backup_suffix: Optional[str] = None) -> Dict[str, str]:
+        """
+        Create an online backup of the database
+        
+        Args:
+            backup_suffix: Optional suffix for backup file
+            
+        Returns:
+            Dictionary mapping the database file to its backup path
+        """
+        if backup_suffix is None:
+            backup_suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        backup_path = self.data_dir / f"data_backup_{backup_suffix}.db"
+        backup_conn = sqlite3.connect(backup_path)
+        try:
+            self._conn.backup(backup_conn)
+        finally:
+            backup_conn.close()
+        
+        return {str(self.db_file): str(backup_path)}
+
+# Shared DataManager instances keyed by data directory
+_data_managers: Dict[str, DataManager] = {}
+_data_managers_lock = threading.Lock()
+
+def get_data_manager(data_directory: str = "data") -> DataManager:
+    """Get the shared DataManager for a data directory, creating it on first use"""
+    with _data_managers_lock:
+        data_manager = _data_managers.get(data_directory)
+        if data_manager is None:
+            data_manager = _data_managers[data_directory] = DataManager(data_directory)
+        return data_manager
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -389,14 +1514,13 @@ if __name__ == "__main__":
         "submission_date": datetime.now().isoformat()
     }
     
-    # Save application
-    apps = dm.load_applications()
-    apps.append(sample_app)
-    dm.save_applications(apps)
+    # Save application and its audit log entry in one write per file
+    with dm.transaction():
+        apps = dm.load_applications()
+        apps.append(sample_app)
+        dm.save_applications(apps)
+        dm.add_audit_log(sample_app['application_id'], "Application submitted")
     print(f"Created application: {sample_app['application_id']}")
-    
-    # Add audit log
-    dm.add_audit_log(sample_app['application_id'], "Application submitted")
     print("Added audit log entry")
     
     # Test certificate management
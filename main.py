@@ -1,15 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional, List, Dict, Any
 import random
+import secrets
 from datetime import datetime, timedelta
-import time
-import json
 import os
+import asyncio
+import logging
+import mmap
+import orjson
+import hashlib
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-app = FastAPI(title="Certificate Management API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load databases and run the background writers for the app's lifetime"""
+    await load_databases()
+    start_background_writers()
+    try:
+        yield
+    finally:
+        try:
+            await stop_audit_log_writer()
+        finally:
+            await flush_databases()
+
+app = FastAPI(
+    title="Certificate Management API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -38,6 +64,17 @@ MACHINE_POOLS = {
         {"id": "SOFT-003", "name": "Software Certificate Engine Gamma", "config": {"keystore": "PKCS#12", "algorithm": "EdDSA"}},
     ]
 }
+VALID_CERT_TYPES = frozenset(MACHINE_POOLS)
+TOTAL_MACHINES = sum(len(machines) for machines in MACHINE_POOLS.values())
+
+# Payment Validation Rules
+VALID_PAYMENT_TYPES = frozenset({"Bank In", "Online Transfer", "Credit Card"})
+MIN_PAYMENT_AMOUNT = 100.0
+MAX_PAYMENT_AMOUNT = 10000.0
+MIN_REFERENCE_LENGTH = 6
+
+# Simulated processing time for auto-processed applications
+AUTO_PROCESSING_DELAY = 2.0  # seconds
 
 # JSON Database Configuration
 DB_DIR = Path("json_db")
@@ -45,7 +82,11 @@ DB_DIR.mkdir(exist_ok=True)
 
 APPLICATIONS_DB_FILE = DB_DIR / "applications.json"
 CERTIFICATES_DB_FILE = DB_DIR / "certificates.json"
-AUDIT_LOG_FILE = DB_DIR / "audit_log.json"
+AUDIT_LOG_FILE = DB_DIR / "audit_log.ndjson"  # one JSON entry per line, append-only
+LEGACY_AUDIT_LOG_FILE = DB_DIR / "audit_log.json"
+
+# Databases at least this large are parsed from a memory map instead of a copy
+MMAP_READ_THRESHOLD = 256 * 1024
 
 # Database Helper Functions
 def load_json_db(file_path: Path, default_value=None):
@@ -53,45 +94,234 @@ def load_json_db(file_path: Path, default_value=None):
     if default_value is None:
         default_value = {}
     
-    if file_path.exists():
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return default_value
-    return default_value
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_READ_THRESHOLD:
+                return orjson.loads(f.read())
+            # Let the OS page a large file in while orjson parses it,
+            # rather than holding a full bytes copy alongside the result
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    except (orjson.JSONDecodeError, FileNotFoundError):
+        return default_value
+
+def replace_file(file_path: Path, content: bytes):
+    """Replace file content atomically"""
+    # Write a sibling temp file and swap it in, so a crash mid-write
+    # never leaves a truncated file behind (unique name, as a background
+    # flush and the shutdown flush may overlap)
+    tmp_path = file_path.with_name(f"{file_path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 def save_json_db(file_path: Path, data):
     """Save data to JSON file"""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    replace_file(file_path, orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+
+def encode_ndjson(entries: List[Dict[str, Any]]) -> bytes:
+    """Serialize entries as newline-delimited JSON"""
+    return b"".join([orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in entries])
+
+def load_audit_log_file() -> List[Dict[str, Any]]:
+    """Load audit log entries from the NDJSON file"""
+    if not AUDIT_LOG_FILE.exists() and LEGACY_AUDIT_LOG_FILE.exists():
+        # Convert the JSON array written by older versions
+        entries = load_json_db(LEGACY_AUDIT_LOG_FILE, [])
+        replace_file(AUDIT_LOG_FILE, encode_ndjson(entries))
+        return entries
+    
+    entries = []
+    try:
+        with open(AUDIT_LOG_FILE, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # Torn trailing line from an interrupted append
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+def append_audit_log_file(entries: List[Dict[str, Any]]):
+    """Append audit log entries to the NDJSON file"""
+    if entries:
+        with open(AUDIT_LOG_FILE, 'a+b') as f:
+            # Terminate a torn final line so the first new entry isn't joined to it
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            f.write(encode_ndjson(entries))
+
+# In-memory Database Cache
+# Parsed databases stay in memory for the life of the process. Saving marks
+# a database dirty and schedules one debounced write, so a burst of requests
+# costs a single file write instead of one parse + rewrite each. Scheduled
+# writes run in a worker thread so the event loop keeps serving requests.
+# Outside the app's lifespan (e.g. scripts) saves write through instead.
+DB_FLUSH_DELAY = 0.1  # seconds
+DB_FLUSH_RETRY_DELAY = 1.0  # seconds, after a failed write
+
+_db_cache: Dict[Path, Any] = {}
+_dirty_dbs: set = set()
+_flush_handle: Optional[asyncio.TimerHandle] = None
+# Created per lifespan, as asyncio primitives bind to the loop that uses them
+_flush_lock: Optional[asyncio.Lock] = None
+_flush_tasks: set = set()
+
+def get_cached_db(file_path: Path, default_value=None):
+    """Get database from the in-memory cache, loading it on first use"""
+    if file_path not in _db_cache:
+        _db_cache[file_path] = load_json_db(file_path, default_value)
+    return _db_cache[file_path]
+
+def save_cached_db(file_path: Path, data):
+    """Store database in the cache and schedule a write-behind flush"""
+    global _flush_handle
+    _db_cache[file_path] = data
+    _dirty_dbs.add(file_path)
+    
+    if _flush_handle is not None:
+        return
+    if _flush_lock is None:
+        # App not running (e.g. scripts), write through immediately
+        flush_dirty_dbs()
+        return
+    _schedule_flush(DB_FLUSH_DELAY)
+
+def _schedule_flush(delay: float):
+    """Schedule a background flush unless one is already pending"""
+    global _flush_handle
+    if _flush_handle is None:
+        _flush_handle = asyncio.get_running_loop().call_later(delay, _start_background_flush)
+
+def _start_background_flush():
+    """Timer callback that runs the debounced flush as a task"""
+    global _flush_handle
+    _flush_handle = None
+    task = asyncio.get_running_loop().create_task(flush_dirty_dbs_in_thread())
+    # Keep a reference so the task isn't garbage collected mid-flush
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+async def flush_dirty_dbs_in_thread():
+    """Write every dirty cached database back to disk from a worker thread"""
+    async with _flush_lock:
+        while _dirty_dbs:
+            file_path = _dirty_dbs.pop()
+            try:
+                await asyncio.to_thread(save_json_db, file_path, _db_cache[file_path])
+            except Exception:
+                # Keep the change pending and try again later
+                _dirty_dbs.add(file_path)
+                logger.exception("Error writing to %s", file_path)
+                _schedule_flush(DB_FLUSH_RETRY_DELAY)
+                return
+
+def flush_dirty_dbs():
+    """Write every dirty cached database back to disk"""
+    global _flush_handle
+    _flush_handle = None
+    while _dirty_dbs:
+        file_path = _dirty_dbs.pop()
+        try:
+            save_json_db(file_path, _db_cache[file_path])
+        except Exception:
+            _dirty_dbs.add(file_path)
+            raise
 
 def get_applications_db():
     """Get applications database"""
-    return load_json_db(APPLICATIONS_DB_FILE, {})
+    return get_cached_db(APPLICATIONS_DB_FILE, {})
 
 def save_applications_db(data):
     """Save applications database"""
-    save_json_db(APPLICATIONS_DB_FILE, data)
+    save_cached_db(APPLICATIONS_DB_FILE, data)
 
 def get_certificates_db():
     """Get certificates database"""
-    return load_json_db(CERTIFICATES_DB_FILE, {})
+    return get_cached_db(CERTIFICATES_DB_FILE, {})
 
 def save_certificates_db(data):
     """Save certificates database"""
-    save_json_db(CERTIFICATES_DB_FILE, data)
+    save_cached_db(CERTIFICATES_DB_FILE, data)
 
 def get_audit_log():
     """Get audit log"""
-    return load_json_db(AUDIT_LOG_FILE, [])
-
-def save_audit_log(data):
-    """Save audit log"""
-    save_json_db(AUDIT_LOG_FILE, data)
+    if AUDIT_LOG_FILE not in _db_cache:
+        _db_cache[AUDIT_LOG_FILE] = load_audit_log_file()
+    return _db_cache[AUDIT_LOG_FILE]
+
+# Audit Log Writer
+# Entries are appended to the in-memory log immediately and queued for a
+# single background task that appends them to the log file in batches of
+# up to AUDIT_BATCH_SIZE entries every AUDIT_BATCH_INTERVAL seconds.
+AUDIT_BATCH_SIZE = 64
+AUDIT_BATCH_INTERVAL = 0.1  # seconds
+AUDIT_RETRY_DELAY = 1.0  # seconds, after a failed append
+
+_audit_queue: Optional[asyncio.Queue] = None
+_audit_writer_task: Optional[asyncio.Task] = None
+
+def _drain_audit_queue() -> List[Dict[str, Any]]:
+    """Take every entry currently waiting in the audit queue"""
+    batch = []
+    while _audit_queue is not None and not _audit_queue.empty():
+        batch.append(_audit_queue.get_nowait())
+    return batch
+
+async def audit_log_writer():
+    """Persist queued audit entries in batches"""
+    batch = []
+    delay = AUDIT_BATCH_INTERVAL
+    while True:
+        if not batch:
+            batch.append(await _audit_queue.get())
+        try:
+            if delay > AUDIT_BATCH_INTERVAL or _audit_queue.qsize() < AUDIT_BATCH_SIZE:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Don't lose a batch already taken off the queue
+            batch.extend(_drain_audit_queue())
+            append_audit_log_file(batch)
+            raise
+        batch.extend(_drain_audit_queue())
+        try:
+            await asyncio.to_thread(append_audit_log_file, batch)
+        except Exception:
+            # Keep the batch and retry it, with anything queued meanwhile
+            logger.exception("Error appending %d audit log entries", len(batch))
+            delay = AUDIT_RETRY_DELAY
+            continue
+        batch = []
+        delay = AUDIT_BATCH_INTERVAL
+
+# In-memory Indexes
+# Secondary lookups over the cached databases, built on first use and kept
+# in step by the functions that modify the underlying records.
+_audit_by_application: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+def get_audit_by_application() -> Dict[str, List[Dict[str, Any]]]:
+    """Get audit log entries grouped by application ID, in log order"""
+    global _audit_by_application
+    if _audit_by_application is None:
+        _audit_by_application = {}
+        for entry in get_audit_log():
+            _audit_by_application.setdefault(entry["application_id"], []).append(entry)
+    return _audit_by_application
 
 # Pydantic Models
 class ApplicationRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     nric: Optional[str] = None
     passport: Optional[str] = None
@@ -104,8 +334,18 @@ class ApplicationRequest(BaseModel):
     payment_mode: str = "Bank In"
     attachments: List[str] = []
     auto_processing: bool = False
+    
+    @field_validator("certificate_type")
+    @classmethod
+    def check_certificate_type(cls, value: str) -> str:
+        """Reject certificate types without a machine pool"""
+        if value not in VALID_CERT_TYPES:
+            raise ValueError(f"Invalid certificate type: {value}")
+        return value
 
 class PaymentValidationRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     application_id: str
     payment_type: str
     bank_name: str
@@ -115,117 +355,234 @@ class PaymentValidationRequest(BaseModel):
     proof_url: Optional[str] = None
 
 class CertificateIssueRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     application_id: str
 
 # Utility Functions
-def generate_application_id() -> str:
+def random_digits(length: int) -> str:
+    """Unpredictable number with exactly `length` digits, for IDs and serials"""
+    lowest = 10 ** (length - 1)
+    return str(lowest + secrets.randbelow(9 * lowest))
+
+def request_now() -> datetime:
+    """Dependency providing one timestamp for everything a request records"""
+    return datetime.now()
+
+def record_etag(body: bytes) -> str:
+    """Weak ETag for an encoded record, so any change to the record changes it"""
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag, compared weakly"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+def generate_application_id(now: Optional[datetime] = None) -> str:
     """Generate unique application ID"""
-    return f"APP{datetime.now().strftime('%Y%m%d')}{random.randint(1000, 9999)}"
+    return f"APP{(now or datetime.now()).strftime('%Y%m%d')}{random_digits(4)}"
 
-def generate_certificate_id() -> str:
+def generate_certificate_id(now: Optional[datetime] = None) -> str:
     """Generate unique certificate ID"""
-    return f"CERT{datetime.now().strftime('%Y%m%d')}{random.randint(10000, 99999)}"
+    return f"CERT{(now or datetime.now()).strftime('%Y%m%d')}{random_digits(5)}"
 
-def assign_machine(certificate_type: str) -> Dict[str, Any]:
+def assign_machine(certificate_type: str, assigned_at: Optional[str] = None) -> Dict[str, Any]:
     """Randomly assign a machine from the pool based on certificate type"""
-    if certificate_type not in MACHINE_POOLS:
-        raise HTTPException(status_code=400, detail=f"Invalid certificate type: {certificate_type}")
-    
-    machines = MACHINE_POOLS[certificate_type]
-    selected_machine = random.choice(machines)
+    # certificate_type is already checked by ApplicationRequest
+    selected_machine = random.choice(MACHINE_POOLS[certificate_type])
     
     return {
         "machine_id": selected_machine["id"],
         "machine_name": selected_machine["name"],
         "machine_config": selected_machine["config"],
-        "assigned_at": datetime.now().isoformat()
+        "assigned_at": assigned_at or datetime.now().isoformat()
     }
 
-def add_audit_log(application_id: str, action: str, details: str, status: str = "SUCCESS"):
+def add_audit_log(application_id: str, action: str, details: str, status: str = "SUCCESS",
+                  timestamp: Optional[str] = None):
     """Add entry to audit log"""
-    audit_log = get_audit_log()
-    audit_log.append({
+    entry = {
         "application_id": application_id,
         "action": action,
         "details": details,
         "status": status,
-        "timestamp": datetime.now().isoformat()
-    })
-    save_audit_log(audit_log)
-
-def validate_payment_simple(payment_data: PaymentValidationRequest) -> Dict[str, Any]:
+        "timestamp": timestamp or datetime.now().isoformat()
+    }
+    audit_log = get_audit_log()
+    # Fetch the index before appending so a first-time build doesn't include the entry twice
+    audit_by_application = get_audit_by_application()
+    audit_log.append(entry)
+    audit_by_application.setdefault(application_id, []).append(entry)
+    
+    if _audit_writer_task is None:
+        # Writer not running (e.g. scripts), write through immediately
+        append_audit_log_file([entry])
+    else:
+        _audit_queue.put_nowait(entry)
+
+def validate_payment_simple(payment_data: PaymentValidationRequest,
+                            validated_at: Optional[str] = None) -> Dict[str, Any]:
     """Simple payment validation with basic checks"""
     
-    applications_db = get_applications_db()
-    
-    # Basic validation rules
-    validation_checks = {
-        "amount_valid": 100.0 <= payment_data.amount <= 10000.0,  # Minimum amount
-        "reference_valid": len(payment_data.reference_no) >= 6,  # Minimum reference length
-        "bank_valid": payment_data.bank_name.strip() != "",
-        "payment_type_valid": payment_data.payment_type in ["Bank In", "Online Transfer", "Credit Card"]
-    }
+    # Basic validation rules (each evaluated once and reused below)
+    amount_valid = MIN_PAYMENT_AMOUNT <= payment_data.amount <= MAX_PAYMENT_AMOUNT
+    valid_format = payment_data.reference_no.isalnum()
+    reference_valid = len(payment_data.reference_no) >= MIN_REFERENCE_LENGTH and valid_format
+    bank_valid = bool(payment_data.bank_name) and not payment_data.bank_name.isspace()
+    payment_type_valid = payment_data.payment_type in VALID_PAYMENT_TYPES
     
     # Security checks (simplified)
-    security_checks = {
-        # "duplicate_reference": payment_data.reference_no not in [
-        #     app.get("payment_reference") for app in applications_db.values()
-        # ],
-        "amount_range": 100.0 <= payment_data.amount <= 10000.0,
-        "valid_format": payment_data.reference_no.isalnum()
+    # duplicate_reference = payment_data.reference_no not in [
+    #     app.get("payment_reference") for app in applications_db.values()
+    # ]
+    amount_range = amount_valid
+    
+    return {
+        "valid": amount_valid and reference_valid and bank_valid and payment_type_valid,
+        "amount_valid": amount_valid,  # Minimum amount
+        "reference_valid": reference_valid,  # Minimum reference length
+        "bank_valid": bank_valid,
+        "payment_type_valid": payment_type_valid,
+        "amount_range": amount_range,
+        "valid_format": valid_format,
+        "validated_at": validated_at or datetime.now().isoformat()
     }
+
+def record_payment_validated(payment_data: PaymentValidationRequest, audit_details: str,
+                             timestamp: Optional[str] = None):
+    """Mark application payment as validated and log it"""
     
-    all_valid = all(validation_checks.values()) and all(security_checks.values())
+    applications_db = get_applications_db()
+    application = applications_db[payment_data.application_id]
     
-    return {
-        "valid": all_valid,
-        # "validation_checks": validation_checks,
-        # "security_checks": security_checks,
-        "amount_valid": 100 <= payment_data.amount <= 10000.0,  # Minimum amount
-        "reference_valid": len(payment_data.reference_no) >= 6 and payment_data.reference_no.isalnum(),  # Minimum reference length
-        "bank_valid": payment_data.bank_name.strip() != "",
-        "payment_type_valid": payment_data.payment_type in ["Bank In", "Online Transfer", "Credit Card"],
-        "amount_range": 100 <= payment_data.amount <= 10000.0,
-        "valid_format": payment_data.reference_no.isalnum(),
-        "validated_at": datetime.now().isoformat()
+    application["payment_validated"] = True
+    application["payment_reference"] = payment_data.reference_no
+    application["status"] = "CERTIFICATE_ISSUED"
+    application["payment_details"] = payment_data.model_dump()
+    save_applications_db(applications_db)
+    
+    add_audit_log(payment_data.application_id, "CERTIFICATE_ISSUED", audit_details, timestamp=timestamp)
+
+def issue_certificate_for_application(application_id: str,
+                                      issued_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Create certificate for an application and return the certificate record"""
+    
+    applications_db = get_applications_db()
+    application = applications_db[application_id]
+    
+    issued_at = issued_at or datetime.now()
+    issued_iso = issued_at.isoformat()
+    cert_id = generate_certificate_id(issued_at)
+    
+    certificate_data = {
+        "certificate_id": cert_id,
+        "application_id": application_id,
+        "holder_name": application["name"],
+        "certificate_type": application["certificate_type"],
+        "issued_date": issued_iso,
+        "expiry_date": (issued_at + timedelta(days=365)).isoformat(),
+        "status": "ACTIVE",
+        "serial_number": f"SN{random_digits(7)}",
+        "machine_used": application["assigned_machine"]["machine_id"]
     }
+    
+    certificates_db = get_certificates_db()
+    certificates_db[cert_id] = certificate_data
+    save_certificates_db(certificates_db)
+    
+    application["certificate_id"] = cert_id
+    application["certificate_issued"] = True
+    application["status"] = "CERTIFICATE_ISSUED"
+    save_applications_db(applications_db)
+    
+    add_audit_log(application_id, "CERTIFICATE_ISSUED", f"Certificate {cert_id} issued successfully",
+                  timestamp=issued_iso)
+    
+    return certificate_data
 
 # API Endpoints
 
+# Lifespan Handlers
+async def load_databases():
+    """Warm the database cache, reading all files concurrently"""
+    db_loaders = {
+        APPLICATIONS_DB_FILE: lambda: load_json_db(APPLICATIONS_DB_FILE, {}),
+        CERTIFICATES_DB_FILE: lambda: load_json_db(CERTIFICATES_DB_FILE, {}),
+        AUDIT_LOG_FILE: load_audit_log_file,
+    }
+    loaded = await asyncio.gather(*(asyncio.to_thread(loader) for loader in db_loaders.values()))
+    for file_path, data in zip(db_loaders, loaded):
+        _db_cache.setdefault(file_path, data)
+
+def start_background_writers():
+    """Create this loop's flush lock and audit queue, and start the audit log writer"""
+    global _flush_lock, _audit_queue, _audit_writer_task
+    _flush_lock = asyncio.Lock()
+    _audit_queue = asyncio.Queue()
+    _audit_writer_task = asyncio.create_task(audit_log_writer())
+
+async def stop_audit_log_writer():
+    """Stop the audit log writer and persist anything still queued"""
+    global _audit_writer_task, _audit_queue
+    if _audit_writer_task is None:
+        return
+    _audit_writer_task.cancel()
+    try:
+        await _audit_writer_task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        _audit_writer_task = None
+        remaining = _drain_audit_queue()
+        _audit_queue = None
+        append_audit_log_file(remaining)
+
+async def flush_databases():
+    """Persist any pending cached database writes"""
+    global _flush_lock
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+    # Wait for in-progress background flushes before writing the rest
+    await asyncio.gather(*_flush_tasks, return_exceptions=True)
+    if _flush_handle is not None:
+        # A failed background write scheduled a retry; write now instead
+        _flush_handle.cancel()
+    flush_dirty_dbs()
+    _flush_lock = None
+
+# The root payload never changes, so it is serialized once at import
+ROOT_RESPONSE_BODY = orjson.dumps({"message": "Certificate Management API", "version": "1.0.0"})
+
 @app.get("/")
 async def root():
-    return {"message": "Certificate Management API", "version": "1.0.0"}
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
 
 @app.post("/apply")
-async def submit_application(application: ApplicationRequest):
+async def submit_application(application: ApplicationRequest, now: datetime = Depends(request_now)):
     """Submit certificate application"""
     
     applications_db = get_applications_db()
+    now_iso = now.isoformat()
     
     try:
         # Generate application ID
-        app_id = generate_application_id()
+        app_id = generate_application_id(now)
         
         # Assign machine from pool
-        machine_info = assign_machine(application.certificate_type)
+        machine_info = assign_machine(application.certificate_type, now_iso)
         
-        # Create application record
+        # Create application record (request already validated by FastAPI)
         application_data = {
             "application_id": app_id,
-            "name": application.name,
-            "nric": application.nric,
-            "passport": application.passport,
-            "dob": application.dob,
-            "nationality": application.nationality,
-            "email": application.email,
-            "organisation": application.organisation,
-            "address": application.address,
-            "certificate_type": application.certificate_type,
-            "payment_mode": application.payment_mode,
-            "attachments": application.attachments,
+            **application.model_dump(exclude={"auto_processing"}),
             "assigned_machine": machine_info,
             "status": "PENDING",
-            "submission_date": datetime.now().isoformat(),
+            "submission_date": now_iso,
             "payment_validated": False,
             "certificate_issued": False
         }
@@ -233,8 +590,10 @@ async def submit_application(application: ApplicationRequest):
         applications_db[app_id] = application_data
         save_applications_db(applications_db)
         
-        add_audit_log(app_id, "APPLICATION_SUBMITTED", f"Application submitted for {application.name}")
-        add_audit_log(app_id, "MACHINE_ASSIGNED", f"Machine {machine_info['machine_id']} assigned")
+        add_audit_log(app_id, "APPLICATION_SUBMITTED", f"Application submitted for {application.name}",
+                      timestamp=now_iso)
+        add_audit_log(app_id, "MACHINE_ASSIGNED", f"Machine {machine_info['machine_id']} assigned",
+                      timestamp=now_iso)
         
         response = {
             "application_id": app_id,
@@ -246,83 +605,68 @@ async def submit_application(application: ApplicationRequest):
         # Auto processing if requested
         if application.auto_processing:
             
-            # Simulate payment validation
-            time.sleep(1)  # Simulate processing time
-            fake_payment = PaymentValidationRequest(
+            # Simulate payment validation and issuance in a single wait
+            await asyncio.sleep(AUTO_PROCESSING_DELAY)
+            
+            # Other requests ran during the wait and may have validated the
+            # payment or issued the certificate already; don't do it twice
+            current = get_applications_db()[app_id]
+            if current["payment_validated"] or current["certificate_issued"]:
+                response.update({
+                    "status": current["status"],
+                    "payment_validated": current["payment_validated"],
+                    "auto_processing_completed": False
+                })
+                if current.get("certificate_id"):
+                    response["certificate_id"] = current["certificate_id"]
+                return ORJSONResponse(response)
+            
+            # Built from trusted in-process values, so skip validation
+            fake_payment = PaymentValidationRequest.model_construct(
                 application_id=app_id,
                 payment_type=application.payment_mode,
                 bank_name="Auto Bank",
                 amount=250.0,
                 # machine_id=machine_info["machine_id"],
-                reference_no=f"AUTO{random.randint(100000, 999999)}"
+                reference_no=f"AUTO{random_digits(6)}"
             )
             
-            print("fake",fake_payment)
-            
-            payment_result = validate_payment_simple(fake_payment)
+            # Payment and issuance happen after the wait, so they get their own timestamp
+            processed_at = datetime.now()
+            processed_iso = processed_at.isoformat()
+            payment_result = validate_payment_simple(fake_payment, processed_iso)
             
             if payment_result["valid"]:
-                applications_db = get_applications_db()  # Reload to get latest data
-                applications_db[app_id]["payment_validated"] = True
-                applications_db[app_id]["payment_reference"] = fake_payment.reference_no
-                applications_db[app_id]["status"] = "CERTIFICATE_ISSUED"
-                save_applications_db(applications_db)
-                
-                add_audit_log(app_id, "CERTIFICATE_ISSUED", "Auto payment validation successful")
+                record_payment_validated(fake_payment, "Auto payment validation successful", processed_iso)
                 
                 # Issue certificate
-                time.sleep(1)  # Simulate processing time
-                cert_id = generate_certificate_id()
-                
-                certificate_data = {
-                    "certificate_id": cert_id,
-                    "application_id": app_id,
-                    "holder_name": application.name,
-                    "certificate_type": application.certificate_type,
-                    "issued_date": datetime.now().isoformat(),
-                    "expiry_date": (datetime.now() + timedelta(days=365)).isoformat(),
-                    "status": "ACTIVE",
-                    "serial_number": f"SN{random.randint(1000000, 9999999)}",
-                    "machine_used": machine_info["machine_id"]
-                }
-                
-                certificates_db = get_certificates_db()
-                certificates_db[cert_id] = certificate_data
-                save_certificates_db(certificates_db)
-                
-                applications_db = get_applications_db()  # Reload again
-                applications_db[app_id]["certificate_id"] = cert_id
-                applications_db[app_id]["certificate_issued"] = True
-                applications_db[app_id]["status"] = "CERTIFICATE_ISSUED"
-                save_applications_db(applications_db)
-                
-                add_audit_log(app_id, "CERTIFICATE_ISSUED", f"Certificate {cert_id} issued successfully")
+                certificate_data = issue_certificate_for_application(app_id, processed_at)
                 
                 response.update({
-                    "certificate_id": cert_id,
+                    "certificate_id": certificate_data["certificate_id"],
                     "status": "CERTIFICATE_ISSUED",
                     "payment_validated": True,
                     "auto_processing_completed": True
                 })
         
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
-        add_audit_log(app_id if 'app_id' in locals() else "UNKNOWN", "ERROR", str(e), "FAILED")
+        add_audit_log(app_id if 'app_id' in locals() else "UNKNOWN", "ERROR", str(e), "FAILED", now_iso)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
 @app.post("/validate-payment")
-async def validate_payment(payment_data: PaymentValidationRequest):
+async def validate_payment(payment_data: PaymentValidationRequest, now: datetime = Depends(request_now)):
     """Validate payment for an application"""
     
+    now_iso = now.isoformat()
     applications_db = get_applications_db()
+    application = applications_db.get(payment_data.application_id)
     
-    if payment_data.application_id not in applications_db:
+    if application is None:
         raise HTTPException(status_code=404, detail="Application not found")
-    
-    application = applications_db[payment_data.application_id]
 
     # Check if provided machine_id matches assigned one
     # assigned_machine_id = application.get("assigned_machine", {}).get("machine_id")
@@ -333,29 +677,24 @@ async def validate_payment(payment_data: PaymentValidationRequest):
     #     raise HTTPException(status_code=400, detail=f"Machine ID mismatch. Expected {assigned_machine_id}")
     
     try:
-        validation_result = validate_payment_simple(payment_data)
+        validation_result = validate_payment_simple(payment_data, now_iso)
         
         if validation_result["valid"]:
-            application["payment_validated"] = True
-            application["payment_reference"] = payment_data.reference_no
-            application["status"] = "CERTIFICATE_ISSUED"
-            application["payment_details"] = payment_data.dict()
-            save_applications_db(applications_db)
-            
-            add_audit_log(payment_data.application_id, "CERTIFICATE_ISSUED", 
-                          f"Payment validated with reference {payment_data.reference_no}")
+            record_payment_validated(payment_data,
+                                     f"Payment validated with reference {payment_data.reference_no}",
+                                     now_iso)
             
-            return {
+            return ORJSONResponse({
                 "detail":{
                     "application_id": payment_data.application_id,
                     "result": validation_result,
                     "status": "CERTIFICATE_ISSUED",
                     "message": "Payment validation successful"
                 }   
-            }
+            })
         else:
             add_audit_log(payment_data.application_id, "PAYMENT_VALIDATION_FAILED", 
-                          f"Validation checks failed", "FAILED")
+                          f"Validation checks failed", "FAILED", now_iso)
             
             raise HTTPException(
                 status_code=400,
@@ -371,7 +710,7 @@ async def validate_payment(payment_data: PaymentValidationRequest):
         # Re-raise HTTPException as is
         raise
     except Exception as e:
-        add_audit_log(payment_data.application_id, "PAYMENT_ERROR", str(e), "FAILED")
+        add_audit_log(payment_data.application_id, "PAYMENT_ERROR", str(e), "FAILED", now_iso)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -431,16 +770,14 @@ async def validate_payment(payment_data: PaymentValidationRequest):
 
 
 @app.post("/issue-certificate")
-async def issue_certificate(request: CertificateIssueRequest):
+async def issue_certificate(request: CertificateIssueRequest, now: datetime = Depends(request_now)):
     """Issue certificate for validated application"""
     
-    applications_db = get_applications_db()
+    application = get_applications_db().get(request.application_id)
     
-    if request.application_id not in applications_db:
+    if application is None:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    application = applications_db[request.application_id]
-    
     if not application["payment_validated"]:
         raise HTTPException(status_code=400, detail="Payment not validated")
     
@@ -448,129 +785,124 @@ async def issue_certificate(request: CertificateIssueRequest):
         raise HTTPException(status_code=400, detail="Certificate already issued")
     
     try:
-        cert_id = generate_certificate_id()
+        certificate_data = issue_certificate_for_application(request.application_id, now)
         
-        certificate_data = {
-            "certificate_id": cert_id,
-            "application_id": request.application_id,
-            "holder_name": application["name"],
-            "certificate_type": application["certificate_type"],
-            "issued_date": datetime.now().isoformat(),
-            "expiry_date": (datetime.now() + timedelta(days=365)).isoformat(),
-            "status": "ACTIVE",
-            "serial_number": f"SN{random.randint(1000000, 9999999)}",
-            "machine_used": application["assigned_machine"]["machine_id"]
-        }
-        
-        certificates_db = get_certificates_db()
-        certificates_db[cert_id] = certificate_data
-        save_certificates_db(certificates_db)
-        
-        applications_db[request.application_id]["certificate_id"] = cert_id
-        applications_db[request.application_id]["certificate_issued"] = True
-        applications_db[request.application_id]["status"] = "CERTIFICATE_ISSUED"
-        save_applications_db(applications_db)
-        
-        add_audit_log(request.application_id, "CERTIFICATE_ISSUED", 
-                     f"Certificate {cert_id} issued successfully")
-        
-        return {
-            "certificate_id": cert_id,
+        return ORJSONResponse({
+            "certificate_id": certificate_data["certificate_id"],
             "application_id": request.application_id,
             "status": "CERTIFICATE_ISSUED",
             "certificate_details": certificate_data
-        }
+        })
         
     except Exception as e:
-        add_audit_log(request.application_id, "CERTIFICATE_ISSUE_ERROR", str(e), "FAILED")
+        add_audit_log(request.application_id, "CERTIFICATE_ISSUE_ERROR", str(e), "FAILED", now.isoformat())
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/application/{application_id}")
-async def get_application_status(application_id: str):
+async def get_application_status(application_id: str, request: Request):
     """Get application status and details"""
     
-    applications_db = get_applications_db()
+    application = get_applications_db().get(application_id)
     
-    if application_id not in applications_db:
+    if application is None:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    return applications_db[application_id]
+    # Status pages poll this endpoint, so unchanged records answer 304
+    # without sending the body
+    body = orjson.dumps(application)
+    etag = record_etag(body)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @app.get("/certificate/{application_id}")
-async def get_certificate_info(application_id: str):
+async def get_certificate_info(application_id: str, request: Request):
     """Get certificate information"""
     
-    certificates = get_certificates_db()
-    for cert in certificates.values():
-        if cert["application_id"] == application_id:
-            return cert
+    # Applications carry the ID of their issued certificate, so resolve
+    # through that instead of scanning every certificate
+    application = get_applications_db().get(application_id)
+    if application and application.get("certificate_id"):
+        cert = get_certificates_db().get(application["certificate_id"])
+        if cert and cert["application_id"] == application_id:
+            body = orjson.dumps(cert)
+            etag = record_etag(body)
+            if etag_matches(request, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            return Response(content=body, media_type="application/json", headers={"ETag": etag})
     raise HTTPException(status_code=404, detail="Certificate with given application ID not found")
 
 @app.get("/applications")
 async def get_all_applications():
     """Get all applications"""
     applications_db = get_applications_db()
-    return {
+    # Records are plain JSON dicts already, so skip jsonable_encoder
+    return ORJSONResponse({
         "applications": list(applications_db.values()),
         "total_count": len(applications_db)
-    }
+    })
 
 @app.get("/certificates")
 async def get_all_certificates():
     """Get all certificates"""
     certificates_db = get_certificates_db()
-    return {
+    return ORJSONResponse({
         "certificates": list(certificates_db.values()),
         "total_count": len(certificates_db)
-    }
+    })
 
 @app.get("/audit-trail")
 async def get_audit_trail(application_id: Optional[str] = None):
     """Get audit trail"""
     
-    audit_log = get_audit_log()
-    
     if application_id:
-        filtered_logs = [log for log in audit_log if log["application_id"] == application_id]
-        return {"audit_trail": filtered_logs}
+        filtered_logs = get_audit_by_application().get(application_id, [])
+        return ORJSONResponse({"audit_trail": filtered_logs})
     
-    return {"audit_trail": audit_log}
+    return ORJSONResponse({"audit_trail": get_audit_log()})
 
 @app.post("/certificate/{certificate_id}/revoke")
-async def revoke_certificate(certificate_id: str):
+async def revoke_certificate(certificate_id: str, now: datetime = Depends(request_now)):
     """Revoke a certificate"""
     
     certificates_db = get_certificates_db()
+    certificate = certificates_db.get(certificate_id)
     
-    if certificate_id not in certificates_db:
+    if certificate is None:
         raise HTTPException(status_code=404, detail="Certificate not found")
     
-    certificates_db[certificate_id]["status"] = "REVOKED"
-    certificates_db[certificate_id]["revoked_date"] = datetime.now().isoformat()
+    now_iso = now.isoformat()
+    certificate["status"] = "REVOKED"
+    certificate["revoked_date"] = now_iso
+    save_certificates_db(certificates_db)
     
     applications_db = get_applications_db()
     
-    # Find and update application
-    for app in applications_db.values():
-        if app.get("certificate_id") == certificate_id:
-            app["status"] = "CERTIFICATE_REVOKED"
-            add_audit_log(app["application_id"], "CERTIFICATE_REVOKED", 
-                         f"Certificate {certificate_id} revoked")
-            break
+    # Certificates point back at their application, so update it directly
+    app = applications_db.get(certificate["application_id"])
+    if app and app.get("certificate_id") == certificate_id:
+        app["status"] = "CERTIFICATE_REVOKED"
+        save_applications_db(applications_db)
+        add_audit_log(app["application_id"], "CERTIFICATE_REVOKED", 
+                     f"Certificate {certificate_id} revoked", timestamp=now_iso)
     
-    return {
+    return ORJSONResponse({
         "certificate_id": certificate_id,
         "status": "REVOKED",
         "message": "Certificate revoked successfully"
-    }
+    })
+
+# Machine pools are static configuration, so the response is serialized once
+MACHINE_POOLS_RESPONSE_BODY = orjson.dumps({
+    "machine_pools": MACHINE_POOLS,
+    "total_machines": TOTAL_MACHINES
+})
 
 @app.get("/machine-pools")
 async def get_machine_pools():
     """Get machine pool information"""
-    return {
-        "machine_pools": MACHINE_POOLS,
-        "total_machines": sum(len(machines) for machines in MACHINE_POOLS.values())
-    }
+    return Response(content=MACHINE_POOLS_RESPONSE_BODY, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,273 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from data_manager import DataManager, SQLiteDataManager
+
+
+class DataManagerScenarios:
+    """Scenarios every storage backend must pass; mixed into one TestCase per backend"""
+
+    manager_class = None
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.managers = []
+        self.dm = self.open_manager()
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def open_manager(self):
+        """Open a new instance on the test's data directory"""
+        manager = self.manager_class(self.data_dir, durable_writes=False)
+        self.managers.append(manager)
+        return manager
+
+    def reopen(self):
+        """Close the current instance and open a fresh one, as after a restart"""
+        self.dm.close()
+        self.managers.remove(self.dm)
+        self.dm = self.open_manager()
+        return self.dm
+
+    # Applications
+    def test_application_lifecycle(self):
+        self.dm.save_applications([
+            {"application_id": "A1", "status": "Pending"},
+            {"application_id": "A2", "status": "Pending"},
+        ])
+        self.assertTrue(self.dm.update_application("A1", {"status": "Approved"}))
+        self.assertFalse(self.dm.update_application("missing", {"status": "Approved"}))
+
+        dm = self.reopen()
+        self.assertEqual([app["application_id"] for app in dm.load_applications()], ["A1", "A2"])
+        self.assertEqual(dm.get_application_by_id("A1")["status"], "Approved")
+        self.assertIn("last_updated", dm.get_application_by_id("A1"))
+        self.assertIsNone(dm.get_application_by_id("missing"))
+
+    def test_duplicate_ids_are_kept_and_first_wins(self):
+        self.dm.save_applications([
+            {"application_id": "A1", "name": "first"},
+            {"application_id": "A1", "name": "second"},
+        ])
+        self.dm.update_application("A1", {"status": "Approved"})
+
+        dm = self.reopen()
+        applications = dm.load_applications()
+        self.assertEqual([app["name"] for app in applications], ["first", "second"])
+        self.assertEqual(applications[0]["status"], "Approved")
+        self.assertNotIn("status", applications[1])
+        self.assertEqual(dm.get_application_by_id("A1")["name"], "first")
+
+    def test_returned_records_are_copies(self):
+        owner = {"name": "Ann"}
+        self.dm.save_applications([{"application_id": "A1", "status": "Pending", "owner": owner}])
+        owner["name"] = "Changed"
+        self.dm.get_application_by_id("A1")["status"] = "Changed"
+        self.dm.load_applications()[0]["owner"]["name"] = "Changed"
+        self.dm.load_applications().append({"application_id": "A2"})
+
+        application = self.dm.get_application_by_id("A1")
+        self.assertEqual(application["status"], "Pending")
+        self.assertEqual(application["owner"], {"name": "Ann"})
+        self.assertEqual(len(self.dm.load_applications()), 1)
+
+    def test_nested_fields_of_logged_records_are_copies(self):
+        details = {"step": 1}
+        self.dm.add_audit_log("A1", "submitted", details)
+        details["step"] = 2
+        self.dm.load_audit_logs()[-1]["details"]["step"] = 3
+        self.dm.get_audit_trail("A1")["audit_trail"][0]["details"]["step"] = 4
+
+        self.assertEqual(self.dm.load_audit_logs()[-1]["details"], {"step": 1})
+
+    def test_generated_ids_are_unique_across_restarts(self):
+        first = [self.dm.generate_application_id() for _ in range(3)]
+        self.dm.save_applications([{"application_id": app_id} for app_id in first])
+
+        dm = self.reopen()
+        self.assertNotIn(dm.generate_application_id(), first)
+        self.assertEqual(len(set(first)), 3)
+
+    # Certificates
+    def test_certificate_lookups(self):
+        self.dm.save_certificates([
+            {"certificate_id": "C1", "application_id": "A1", "status": "Valid"},
+            {"certificate_id": "C2", "application_id": "A2", "status": "Valid"},
+        ])
+        self.assertTrue(self.dm.update_certificate("C2", {"status": "Revoked"}))
+        self.assertFalse(self.dm.update_certificate("missing", {"status": "Revoked"}))
+
+        dm = self.reopen()
+        self.assertEqual(dm.get_certificate_by_id("C2")["status"], "Revoked")
+        self.assertEqual(dm.get_certificate_by_application_id("A1")["certificate_id"], "C1")
+        self.assertIsNone(dm.get_certificate_by_application_id("missing"))
+
+    # Payments and audit logs
+    def test_payments_by_application(self):
+        self.dm.add_payment_record({"application_id": "A1", "amount": 10})
+        self.dm.add_payment_record({"application_id": "A2", "amount": 20})
+        self.dm.add_payment_record({"application_id": "A1", "amount": 30})
+
+        dm = self.reopen()
+        payments = dm.get_payments_by_application_id("A1")
+        self.assertEqual([payment["amount"] for payment in payments], [10, 30])
+        self.assertTrue(all("created_at" in payment for payment in payments))
+        self.assertEqual(dm.get_payments_by_application_id("missing"), [])
+        self.assertEqual(len(dm.load_payments()), 3)
+
+    def test_audit_trail(self):
+        for action in ("submitted", "reviewed", "approved"):
+            self.dm.add_audit_log("A1", action, {"step": action})
+        self.dm.add_audit_log("A2", "submitted")
+
+        dm = self.reopen()
+        trail = dm.get_audit_trail("A1")
+        self.assertEqual(trail["total_entries"], 3)
+        self.assertEqual([log["action"] for log in trail["audit_trail"]],
+                         ["submitted", "reviewed", "approved"])
+        self.assertEqual(trail["first_entry"], trail["audit_trail"][0]["timestamp"])
+        self.assertEqual(dm.get_audit_trail("missing")["total_entries"], 0)
+
+    # Transactions
+    def test_transaction_commits_every_change(self):
+        with self.dm.transaction():
+            self.dm.save_applications([{"application_id": "A1"}])
+            self.dm.update_application("A1", {"status": "Approved"})
+            self.dm.add_payment_record({"application_id": "A1"})
+            self.dm.add_audit_log("A1", "approved")
+
+        dm = self.reopen()
+        self.assertEqual(dm.get_application_by_id("A1")["status"], "Approved")
+        self.assertEqual(len(dm.load_payments()), 1)
+        self.assertEqual(len(dm.load_audit_logs()), 1)
+
+    def test_transaction_rolls_back_when_block_raises(self):
+        self.dm.save_applications([{"application_id": "A1", "status": "Pending"}])
+        with self.assertRaises(RuntimeError):
+            with self.dm.transaction():
+                self.dm.update_application("A1", {"status": "Approved"})
+                self.dm.add_payment_record({"application_id": "A1"})
+                self.dm.add_audit_log("A1", "approved")
+                raise RuntimeError("abort")
+
+        for reopen in (False, True):
+            dm = self.reopen() if reopen else self.dm
+            self.assertEqual(dm.get_application_by_id("A1")["status"], "Pending")
+            self.assertEqual(dm.load_payments(), [])
+            self.assertEqual(dm.load_audit_logs(), [])
+
+    def test_exception_caught_inside_transaction_still_commits(self):
+        self.dm.save_applications([{"application_id": "A1", "status": "Pending"}])
+        with self.dm.transaction():
+            try:
+                with self.dm.transaction():
+                    self.dm.update_application("A1", {"status": "Approved"})
+                    raise RuntimeError("handled")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(self.reopen().get_application_by_id("A1")["status"], "Approved")
+
+    def test_full_save_in_transaction_replaces_appended_records(self):
+        with self.dm.transaction():
+            self.dm.add_audit_log("A1", "submitted")
+            self.dm.save_audit_logs([])
+            self.dm.add_payment_record({"application_id": "A1"})
+            self.dm.save_payments(self.dm.load_payments())
+
+        dm = self.reopen()
+        self.assertEqual(dm.load_audit_logs(), [])
+        self.assertEqual(len(dm.load_payments()), 1)
+
+    # Utilities
+    def test_statistics(self):
+        self.dm.save_applications([
+            {"application_id": "A1", "status": "Pending"},
+            {"application_id": "A2", "status": "Approved"},
+            {"application_id": "A3", "status": "Pending"},
+        ])
+        self.dm.add_payment_record({"application_id": "A1", "status": "Paid"})
+        self.dm.add_audit_log("A1", "submitted")
+
+        stats = self.dm.get_statistics()
+        self.assertEqual(stats["applications"], {"total": 3, "by_status": {"Pending": 2, "Approved": 1}})
+        self.assertEqual(stats["payments"]["by_status"], {"Paid": 1})
+        self.assertEqual(stats["audit_logs"]["total"], 1)
+
+    def test_backup_is_a_point_in_time_snapshot(self):
+        self.dm.save_applications([{"application_id": "A1", "status": "Pending"}])
+        self.dm.add_audit_log("A1", "submitted")
+        self.dm.add_payment_record({"application_id": "A1"})
+        backup_paths = self.dm.backup_data("snap")
+        snapshot = {path: Path(path).read_bytes() for path in backup_paths.values()}
+
+        self.dm.update_application("A1", {"status": "Approved"})
+        self.dm.add_audit_log("A1", "approved")
+        self.dm.add_payment_record({"application_id": "A1"})
+        self.dm.flush()
+
+        for path, content in snapshot.items():
+            self.assertEqual(Path(path).read_bytes(), content, path)
+
+    def test_clear_all_data(self):
+        self.dm.save_applications([{"application_id": "A1"}])
+        self.dm.add_audit_log("A1", "submitted")
+        with self.assertRaises(ValueError):
+            self.dm.clear_all_data()
+
+        result = self.dm.clear_all_data(confirm=True)
+        self.assertTrue(all(Path(path).exists() for path in result["backup_created"].values()))
+        dm = self.reopen()
+        self.assertEqual(dm.load_applications(), [])
+        self.assertEqual(dm.get_audit_trail("A1")["total_entries"], 0)
+
+
+class JSONDataManagerTest(DataManagerScenarios, unittest.TestCase):
+    manager_class = DataManager
+
+    def test_journaled_updates_are_seen_by_other_instances(self):
+        self.dm.save_applications([
+            {"application_id": "A1", "status": "Pending"},
+            {"application_id": "A2", "status": "Pending"},
+        ])
+        other = self.open_manager()
+        other.load_applications()
+
+        self.dm.update_application("A1", {"status": "Paid"})
+        self.assertEqual(other.get_application_by_id("A1")["status"], "Paid")
+
+        # A save from a copy loaded before the update keeps the update journaled
+        stale = other.load_applications()
+        self.dm.update_application("A2", {"status": "Paid"})
+        other.save_applications(stale)
+        self.assertEqual(self.open_manager().get_application_by_id("A2")["status"], "Paid")
+
+    def test_backup_from_fresh_instance_includes_journaled_updates(self):
+        self.dm.save_applications([{"application_id": "A1", "status": "Pending"}])
+        self.dm.update_application("A1", {"status": "Paid"})
+
+        backup_paths = self.open_manager().backup_data("fresh")
+        applications_backup = Path(backup_paths[str(self.dm.applications_file)])
+        self.assertIn(b'"status":"Paid"', applications_backup.read_bytes())
+
+    def test_append_after_torn_line_keeps_new_record(self):
+        self.dm.add_audit_log("A1", "one")
+        with open(self.dm.audit_logs_file, 'ab') as f:
+            f.write(b'{"log_id": "torn", "applic')
+        self.dm.add_audit_log("A1", "two")
+
+        actions = [log["action"] for log in self.open_manager().load_audit_logs()]
+        self.assertEqual(actions, ["one", "two"])
+
+
+class SQLiteDataManagerTest(DataManagerScenarios, unittest.TestCase):
+    manager_class = SQLiteDataManager
+
+
+if __name__ == "__main__":
+    unittest.main()